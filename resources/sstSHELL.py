@@ -14,6 +14,27 @@ import re
 import fileinput
 import xml.etree.ElementTree as ET
 import argparse
+import hashlib
+import shutil
+import glob
+import json
+import collections
+import itertools
+import time
+import csv
+import random
+import ast
+import math
+import signal
+import resource
+import mmap
+import gzip
+import array
+import bisect
+
+
+# Location of the on-disk cache of the sst-info element catalog
+cacheDir = os.path.join(os.getenv('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'sstGUI')
 
 
 # Move and update the template files to create a new model
@@ -39,72 +60,64 @@ def createModel(model, template, path):
 			os.system('cp -r ' + template + '/' + file + ' ' + path + '/' + model + '/.')
 
 
+# A component to connect: element library, component name, names of the
+# subcomponents to put in its slots and the number of copies to create
+ComponentSpec = collections.namedtuple('ComponentSpec', ['element', 'component', 'subcomponents', 'count'], defaults=[(), 1])
+
+
+# Parse the command line component list into ComponentSpecs
+# Format is <element>.<component>.<subcomponent>,<subcomponent>*<count>;
+# the subcomponents and the *<count> are optional
+def parseComponentList(componentList):
+	specs = []
+	for component in componentList.rstrip(';').split(';'):
+		component, sep, count = component.partition('*')
+		(element, comp, *sub) = component.split('.')
+		specs.append(ComponentSpec(element, comp, sub[0].split(',') if sub else [], int(count) if sep else 1))
+	return specs
+
+
 # Connect various models together
-def connectModels(model, componentList, path):
-	components = componentList.rstrip(';').split(';')
+# components is either the command line string (see parseComponentList) or
+# a list of ComponentSpecs. A catalog from loadCatalog can be passed in so
+# many models can be connected without reading the sst-info catalog each time
+def connectModels(model, components, path, catalog=None):
+	if isinstance(components, str):
+		components = parseComponentList(components)
+	if catalog is None:
+		catalog = loadCatalog()
+	# Every copy of a component gets its own objN
+	instances = []
+	for spec in components:
+		spec = ComponentSpec(*spec)
+		instances.extend([(spec.element, spec.component, list(spec.subcomponents))] * spec.count)
 	os.system('rm -rf ' + path + '/' + model)
 	os.system('mkdir -p ' + path + '/' + model)
-	elements = ET.fromstring(runCommand('sst-info -qnxo /dev/stdout'))
 	with open(path + '/' + model + '/' + model + '.py', 'w') as fp:
 		fp.write('import sst\n\n# TODO: Check the parameters for all components and connect the links at the bottom before running!!!\n\n')
 		# Loop through all the components
-		for i in range(len(components)):
-			component = components[i]
-			(element, comp, *sub) = component.split('.')
-			if sub:
-				sub = sub[0].split(',')
+		for i in range(len(instances)):
+			(element, comp, sub) = instances[i]
 			# Write the Component Definition
 			fp.write('obj' + str(i) + ' = sst.Component("' + comp + str(i) + '", "' + element + '.' + comp + '")\n')
-			parameters = elements.find("*/Component[@Name='" + comp + "']").findall('Parameter')
-			if parameters:
-				fp.write('obj' + str(i) + '.addParams({\n')
-				# Remove the DEPRECATED parameters
-				params = []
-				for param in parameters:
-					if 'DEPRECATED' not in param.get('Description'):
-						params.append(param)
-				# Write out all of the available parameters with their defaults and description
-				for k in range(len(params)):
-					if k == len(params) - 1:
-						fp.write('\t"' + params[k].get('Name') + '" : "' + params[k].get('Default') + '"}) # ' + params[k].get('Description') + '\n\n')
-					else:
-						fp.write('\t"' + params[k].get('Name') + '" : "' + params[k].get('Default') + '", # ' + params[k].get('Description') + '\n')
-			else:
-				fp.write('\n')
+			compInfo = catalog.find(comp, element, 'Component')
+			writeParams(fp, 'obj' + str(i), catalog.params(compInfo))
 			# Create any subcomponents
 			for j in range(len(sub)):
 				s = sub[j]
 				# Write the Subcomponent Definition
-				slots = elements.find("*/Component[@Name='" + comp + "']").findall('SubComponentSlot')
-				subcomp = elements.find("*/SubComponent[@Name='" + s + "']")
-				for slot in slots:
-					if slot.get('Interface') == subcomp.get('Interface'):
-						fp.write('sub' + str(i) + str(j) + ' = obj' + str(i) + '.setSubComponent("' + slot.get('Name') + '", "' + element + '.' + s + '", ' + str(j) + ')\n')
-				parameters = elements.find("*/SubComponent[@Name='" + s + "']").findall('Parameter')
-				if parameters:
-					fp.write('sub' + str(i) + str(j) + '.addParams({\n')
-					# Remove the DEPRECATED parameters
-					params = []
-					for param in parameters:
-						if 'DEPRECATED' not in param.get('Description'):
-							params.append(param)
-					# Write out all of the available parameters with their defaults and description
-					for k in range(len(params)):
-						if k == len(params) - 1:
-							fp.write('\t"' + params[k].get('Name') + '" : "' + params[k].get('Default') + '"}) # ' + params[k].get('Description') + '\n\n')
-						else:
-							fp.write('\t"' + params[k].get('Name') + '" : "' + params[k].get('Default') + '", # ' + params[k].get('Description') + '\n')
-				else:
-					fp.write('\n')
+				subInfo = catalog.find(s, element, 'SubComponent')
+				for slot in catalog.slotsFor(compInfo, subInfo):
+					fp.write('sub' + str(i) + str(j) + ' = obj' + str(i) + '.setSubComponent("' + slot.get('Name') + '", "' + subInfo['Element'] + '.' + s + '", ' + str(j) + ')\n')
+				writeParams(fp, 'sub' + str(i) + str(j), catalog.params(subInfo))
 			fp.write('\n')
 		fp.write('\n###################################################################\n')
 		fp.write('# TODO: Links have the first port connected but need to be manually\n')
 		fp.write('# connected to a second port to work. Delays also should be edited\n\n')
 		# After all components have been declared, write links
-		for i in range(len(components)):
-			component = components[i]
-			(element, comp, *sub) = component.split('.')
-			ports = elements.find("*/Component[@Name='" + comp + "']").findall('Port')
+		for i in range(len(instances)):
+			(element, comp, sub) = instances[i]
+			ports = catalog.find(comp, element, 'Component')['Port']
 			if ports:
 				fp.write('# ' + 'obj' + str(i) + ' Links\n')
 			# Write out all of the available ports with their descriptions
@@ -114,17 +127,28 @@ def connectModels(model, componentList, path):
 			if ports:
 				fp.write('\n')
 			# Write links for subcomponents
-			if sub:
-				sub = sub[0].split(',')
-				for j in range(len(sub)):
-					s = sub[j]
-					ports = elements.find("*/SubComponent[@Name='" + s + "']").findall('Port')
-					if ports:
-						fp.write('# ' + 'sub' + str(i) + str(j) + ' Links\n')
-					for k in range(len(ports)):
-						fp.write('sst.Link("' + s + str(i) + str(j) + '_' + ports[k].get('Name') + '").connect( (sub' + str(i) + str(j) + ', "' + ports[k].get('Name') + '", "1ps"), (OBJNAME, "PORTNAME", "DELAY") ) # ' + ports[k].get('Description') + '\n')
-					if ports:
-						fp.write('\n')
+			for j in range(len(sub)):
+				s = sub[j]
+				ports = catalog.find(s, element, 'SubComponent')['Port']
+				if ports:
+					fp.write('# ' + 'sub' + str(i) + str(j) + ' Links\n')
+				for k in range(len(ports)):
+					fp.write('sst.Link("' + s + str(i) + str(j) + '_' + ports[k].get('Name') + '").connect( (sub' + str(i) + str(j) + ', "' + ports[k].get('Name') + '", "1ps"), (OBJNAME, "PORTNAME", "DELAY") ) # ' + ports[k].get('Description') + '\n')
+				if ports:
+					fp.write('\n')
+
+
+# Write an addParams block with every parameter, its default and description
+def writeParams(fp, obj, params):
+	if params:
+		fp.write(obj + '.addParams({\n')
+		for k in range(len(params)):
+			if k == len(params) - 1:
+				fp.write('\t"' + params[k].get('Name') + '" : "' + params[k].get('Default') + '"}) # ' + params[k].get('Description') + '\n\n')
+			else:
+				fp.write('\t"' + params[k].get('Name') + '" : "' + params[k].get('Default') + '", # ' + params[k].get('Description') + '\n')
+	else:
+		fp.write('\n')
 
 
 # Create a subcomponent
@@ -192,131 +216,1441 @@ def createSubcomponent(name, subcomp, header):
 		cFile.write(str(ctxt))
 		
 
+# Scale of the SI and binary prefixes a range bound may carry
+decimalPrefixes = {'a': 1e-18, 'f': 1e-15, 'p': 1e-12, 'n': 1e-9, 'u': 1e-6, 'm': 1e-3,
+                   'k': 1e3, 'K': 1e3, 'M': 1e6, 'G': 1e9, 'T': 1e12, 'P': 1e15, 'E': 1e18}
+binaryPrefixes = {'Ki': 2**10, 'Mi': 2**20, 'Gi': 2**30, 'Ti': 2**40, 'Pi': 2**50, 'Ei': 2**60}
+# Units SST reads with a prefix (UnitAlgebra), other units are kept as written
+prefixedUnits = {'s', 'Hz', 'B', 'b', 'Bps', 'bps', 'B/s', 'b/s', 'event', 'events', 'W', 'J', 'V', 'A'}
+
+
+# A range bound or increment: a decimal, float or 0x hex number with an
+# optional prefixed unit attached, like 2, 0.25, 0x1f, 1KiB or 2.5GHz
+rangeQuantity = r'(-?(?:0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?))([A-Za-z]*)'
+# start-end;increment[ unit] or start-end;x<factor>[ unit] for a geometric range,
+# with optional spaces around the separators like 2 - 6; 2
+rangeFormat = re.compile('^' + rangeQuantity + r'\s*-\s*' + rangeQuantity + r'\s*;\s*([x*]?)\s*' + rangeQuantity + r'(?: +(\S+))?$')
+
+
+# Splits a quantity into its number, prefix scale, unit and prefix family
+# A letter is only a prefix in front of a unit SST knows, so 5m, 100Pa or
+# 3min keep their unit as it is
+def parseQuantity(number, unit):
+	value = int(number, 0) if re.match(r'^-?(\d+|0[xX][0-9a-fA-F]+)$', number) else float(number)
+	if unit[:2] in binaryPrefixes and unit[2:] in prefixedUnits:
+		return value, binaryPrefixes[unit[:2]], unit[2:], binaryPrefixes
+	if unit[:1] in decimalPrefixes and unit[1:] in prefixedUnits:
+		return value, decimalPrefixes[unit[0]], unit[1:], decimalPrefixes
+	return value, 1, unit, None
+
+
+# Writes a number without trailing zeros or float noise
+def formatNumber(value):
+	if isinstance(value, int):
+		return str(value)
+	return '%.12g' % value
+
+
+# Writes a value in base units with the prefix of the family that keeps the
+# number between 1 and the next prefix, exact multiples for binary prefixes
+def formatQuantity(value, unit, prefixes):
+	best = ''
+	for prefix, scale in sorted(list(prefixes.items()) + [('', 1)], key=lambda item: item[1]):
+		if abs(value) < scale * (1 - 1e-12):
+			continue
+		if prefixes is binaryPrefixes and (value % scale):
+			continue
+		best = prefix
+	number = value / prefixes[best] if best else value
+	if isinstance(number, float) and number.is_integer() and abs(number) < 2**53:
+		number = int(number)
+	return formatNumber(number) + best + unit
+
+
+# Values of a range, count values from start by adding increment or, for a
+# geometric range, multiplying by it. Each value is computed from its index
+# so float steps do not accumulate error
+def rangeValues(start, increment, count, geometric):
+	if geometric:
+		return [start * increment**k for k in range(count)]
+	if isinstance(start, int) and isinstance(increment, int):
+		return list(range(start, start + increment * count, increment))
+	return [start + increment * k for k in range(count)]
+
+
+# Expand a sweep value into the list of values it stands for
+# Returns None if the value is not a sweep. Valid formats are
+# start-end;increment[ unit], start-end;x<factor>[ unit] and first,second,...
+# Bounds may be floats and carry SI (k, M, G, m, u, n...) or binary (Ki, Mi,
+# Gi...) prefixed units, like 0.5GHz-2GHz;0.25GHz or 1KiB-1MiB;x2. A linear
+# range ends at the first value past end when increment does not divide it
+# Raises ValueError for a range without any value, like 1-10;-1 or 1-10;x0.5
+def sweepValues(value):
+	if ';' in value:
+		match = rangeFormat.match(value.strip())
+		if match is None:
+			return None
+		def invalid(reason):
+			return ValueError('Sweep range "' + value + '" ' + reason)
+		startNumber, startUnit, endNumber, endUnit, step, incNumber, incUnit, unit = match.groups()
+		start, startScale, startBase, startFamily = parseQuantity(startNumber, startUnit)
+		end, endScale, endBase, endFamily = parseQuantity(endNumber, endUnit)
+		inc, incScale, incBase, incFamily = parseQuantity(incNumber, incUnit)
+		geometric = step != ''
+		attached = startUnit or endUnit or (incUnit and not geometric)
+		if attached:
+			# Work in base units, the bounds have to share their unit
+			base = startBase or endBase or incBase
+			if startBase not in ('', base) or endBase not in ('', base) or (not geometric and incBase not in ('', base)):
+				raise invalid('mixes units')
+			start, end = start * startScale, end * endScale
+			if not geometric:
+				inc = inc * incScale
+			prefixes = startFamily or endFamily or incFamily
+			if base not in prefixedUnits:
+				# Units SST does not prefix are written without one
+				prefixes = {}
+			elif prefixes is None:
+				prefixes = decimalPrefixes
+			if prefixes is decimalPrefixes:
+				# Write kilo the way the range does
+				kilo = 'K' if 'K' in (startUnit[:1], endUnit[:1], incUnit[:1]) else 'k'
+				prefixes = {prefix: scale for prefix, scale in decimalPrefixes.items() if prefix != ('k' if kilo == 'K' else 'K')}
+		if geometric:
+			if inc <= 0 or inc == 1 or start == 0 or (start > 0) != (end > 0):
+				raise invalid('never reaches its end')
+			count = int(math.floor(math.log(end / start) / math.log(inc) + 1e-9)) + 1
+		else:
+			if inc == 0:
+				raise invalid('has a zero increment')
+			if isinstance(start, int) and isinstance(end, int) and isinstance(inc, int):
+				count = len(range(start, end + inc, inc))
+			else:
+				count = int(math.ceil((end - start) / inc + 1 - 1e-9))
+		if count <= 0:
+			raise invalid('has no values, its step goes away from its end')
+		values = rangeValues(start, inc, count, geometric)
+		if attached:
+			return [formatQuantity(v, base, prefixes) + (' ' + unit if unit else '') for v in values]
+		if unit:
+			return [formatNumber(v) + ' ' + unit for v in values]
+		return [formatNumber(v) for v in values]
+	elif ',' in value:
+		return value.split(',')
+	return None
+
+
+# A string parameter of an addParams dict literal in a test file, start and
+# end are the offsets of its value literal (quotes included) in the file text
+TestParam = collections.namedtuple('TestParam', ['name', 'value', 'start', 'end'])
+
+
+# Parsed test files, file name -> (stamp, text, params, prologue)
+testParams = {}
+
+
+# Parses a test file with the ast module and returns its text, every string
+# parameter of its addParams dict literals, in file order, and the offset
+# past its prologue: the shebang, encoding line, docstring and __future__
+# imports that have to stay at the top, where code may be added to the file
+# Files that do not parse have no parameters, sst reports their error when
+# they run. The result is memoized until the modification time or size of
+# the file change
+def parseParams(filename):
+	stamp = fileStamp(filename)
+	cached = testParams.get(filename)
+	if cached is not None and cached[0] == stamp:
+		return cached[1:]
+	with open(filename, 'r') as fp:
+		text = fp.read()
+	params = []
+	prologue = 0
+	try:
+		tree = ast.parse(text, filename)
+	except (SyntaxError, ValueError):
+		tree = None
+	if tree is not None:
+		# ast positions are line numbers and UTF-8 byte columns
+		lines = text.split('\n')
+		starts = [0]
+		for line in lines:
+			starts.append(starts[-1] + len(line) + 1)
+		def offset(lineno, col):
+			return starts[lineno - 1] + len(lines[lineno - 1].encode('utf-8')[:col].decode('utf-8'))
+		for node in ast.walk(tree):
+			if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == 'addParams' \
+			   and node.args and isinstance(node.args[0], ast.Dict):
+				for key, value in zip(node.args[0].keys, node.args[0].values):
+					if isinstance(key, ast.Constant) and isinstance(key.value, str) \
+					   and isinstance(value, ast.Constant) and isinstance(value.value, str):
+						params.append(TestParam(key.value, value.value, offset(value.lineno, value.col_offset),
+						                        offset(value.end_lineno, value.end_col_offset)))
+		params.sort(key=lambda param: param.start)
+		# The shebang goes on the first line and the encoding on one of the first two
+		for lineno, line in enumerate(lines[:2]):
+			if (lineno == 0 and line.startswith('#!')) or re.match(r'^[ \t\f]*#.*?coding[:=]', line):
+				prologue = starts[lineno + 1]
+		for index, node in enumerate(tree.body):
+			docstring = index == 0 and isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant) \
+			            and isinstance(node.value.value, str)
+			if not docstring and not (isinstance(node, ast.ImportFrom) and node.module == '__future__'):
+				break
+			prologue = starts[node.end_lineno]
+		prologue = min(prologue, len(text))
+	testParams[filename] = (stamp, text, params, prologue)
+	return text, params, prologue
+
+
+# A test file parsed once for a parameter sweep. The text is split around
+# the literals of the swept values so every combination is rendered by
+# filling in the slots instead of scanning the file again
+class SweepTemplate:
+
+	def __init__(self, filename):
+		self.filename = filename
+		self.names = []    # name of every swept parameter
+		self.sweeps = []   # values of every swept parameter in file order
+		self.ranges = []   # whether every swept value is a range, the others are lists
+		self.quotes = []   # quote character of every swept literal, None to use repr
+		self.segments = [] # text between the swept literals, one more than sweeps
+		text, params, self.prologue = parseParams(filename)
+		last = 0
+		for param in params:
+			values = sweepValues(param.value)
+			if values is not None:
+				literal = text[param.start:param.end]
+				self.segments.append(text[last:param.start])
+				self.names.append(param.name)
+				self.sweeps.append(values)
+				self.ranges.append(';' in param.value)
+				# Plain literals keep their quotes, anything else is written with repr
+				plain = len(literal) >= 2 and literal[0] in '"\'' and literal[1:-1] == param.value
+				self.quotes.append(literal[0] if plain else None)
+				last = param.end
+		self.segments.append(text[last:])
+
+
+	# Python literal of a value for a slot
+	def literal(self, slot, value):
+		quote = self.quotes[slot]
+		if quote is not None and quote not in value and '\\' not in value and '\n' not in value:
+			return quote + value + quote
+		return repr(value)
+
+
+	# Number of test files the sweep expands into
+	def size(self, sampling=None):
+		return sweepSize(self.sweeps, sampling)
+
+
+	# Every combination of the swept values, see sweepPoints, or a sample of
+	# them, see samplePoints
+	def points(self, sampling=None):
+		if sampling is None or sampling.method == 'grid':
+			return sweepPoints(self.sweeps)
+		return samplePoints(self.sweeps, sampling)
+
+
+	# Values of the swept parameters for one combination
+	def values(self, point):
+		return [self.sweeps[i][point[i]] for i in range(len(point))]
+
+
+	# Text of the test file for one combination
+	def render(self, point):
+		values = self.values(point)
+		return self.fill([self.literal(i, values[i]) for i in range(len(values))])
+
+
+	# Text of the test file with the given code in the slots
+	def fill(self, values):
+		parts = [self.segments[0]]
+		for i in range(len(values)):
+			parts.append(values[i])
+			parts.append(self.segments[i + 1])
+		return ''.join(parts)
+
+
+# Find the parameters of a test file that need swept, an empty list if none
+# Returns the list of values for every swept parameter in file order
+def findSweeps(filename):
+	return SweepTemplate(filename).sweeps
+
+
+# Number of test files a sweep expands into, at most the budget if sampled
+def sweepSize(sweeps, sampling=None):
+	size = 1
+	for values in sweeps:
+		size *= len(values)
+	if sampling is not None and sampling.method != 'grid':
+		return min(size, sampling.budget)
+	return size
+
+
+# Lazily generate every combination of the swept values. Each point is a
+# tuple with the index into the values of every swept parameter
+def sweepPoints(sweeps):
+	return itertools.product(*[range(len(values)) for values in sweeps])
+
+
+# Index tuple of a point number, in the order sweepPoints generates them
+def sweepPoint(sweeps, number):
+	point = []
+	for values in reversed(sweeps):
+		point.insert(0, number % len(values))
+		number //= len(values)
+	return tuple(point)
+
+
+# How to pick the points of a sweep: method is one of samplingMethods, budget
+# is the number of points to run and seed makes the sample reproducible
+Sampling = collections.namedtuple('Sampling', ['method', 'budget', 'seed'], defaults=[0])
+samplingMethods = ['grid', 'random', 'lhs', 'sobol', 'halton']
+
+
+# Sobol direction numbers from Joe and Kuo (new-joe-kuo-6.21201) as
+# (degree, coefficients, initial m values) for dimensions 2 and up
+sobolDirections = [
+	(1, 0, [1]), (2, 1, [1, 3]), (3, 1, [1, 3, 1]), (3, 2, [1, 1, 1]),
+	(4, 1, [1, 1, 3, 3]), (4, 4, [1, 3, 5, 13]), (5, 2, [1, 1, 5, 5, 17]),
+	(5, 4, [1, 1, 5, 5, 5]), (5, 7, [1, 1, 7, 11, 19]), (5, 11, [1, 1, 5, 1, 1]),
+	(5, 13, [1, 1, 1, 3, 11]), (5, 14, [1, 3, 5, 5, 31]), (6, 1, [1, 3, 3, 9, 7, 49]),
+	(6, 13, [1, 1, 1, 15, 21, 21]), (6, 16, [1, 3, 1, 13, 27, 49]),
+	(6, 19, [1, 1, 1, 15, 7, 5]), (6, 22, [1, 3, 1, 15, 13, 25]),
+	(6, 25, [1, 1, 5, 5, 19, 61]), (7, 1, [1, 3, 7, 11, 23, 15, 103]),
+	(7, 4, [1, 3, 7, 13, 13, 15, 69])]
+sobolBits = 30
+
+
+# Unit cube points of a Sobol sequence in gray code order, the seed picks a
+# random digital shift which keeps the stratification of the sequence
+def sobolSequence(dims, rng):
+	directions = [[1 << (sobolBits - 1 - k) for k in range(sobolBits)]]
+	for degree, coefficients, initial in sobolDirections[:dims - 1]:
+		v = [initial[k] << (sobolBits - 1 - k) for k in range(degree)]
+		for k in range(degree, sobolBits):
+			x = v[k - degree] ^ (v[k - degree] >> degree)
+			for j in range(1, degree):
+				if (coefficients >> (degree - 1 - j)) & 1:
+					x ^= v[k - j]
+			v.append(x)
+		directions.append(v)
+	shift = [rng.getrandbits(sobolBits) for _ in range(dims)]
+	x = [0] * dims
+	number = 0
+	while True:
+		yield [(x[i] ^ shift[i]) / (1 << sobolBits) for i in range(dims)]
+		# The next point flips the direction of the lowest zero bit
+		bit = (~number & (number + 1)).bit_length() - 1
+		for i in range(dims):
+			x[i] ^= directions[i][bit]
+		number += 1
+
+
+# Unit cube points of a Halton sequence, one prime base per dimension, the seed
+# picks a random start so different seeds give different samples
+def haltonSequence(dims, rng):
+	primes = []
+	candidate = 2
+	while len(primes) < dims:
+		if all(candidate % prime for prime in primes):
+			primes.append(candidate)
+		candidate += 1
+	number = rng.randrange(1 << 16)
+	while True:
+		number += 1
+		point = []
+		for base in primes:
+			value, fraction, n = 0.0, 1.0 / base, number
+			while n:
+				value += (n % base) * fraction
+				n //= base
+				fraction /= base
+			point.append(value)
+		yield point
+
+
+# Unit cube points of Latin hypercubes of budget points each, every dimension
+# is cut into budget strata and each stratum holds one point of a hypercube
+def latinHypercube(dims, budget, rng):
+	while True:
+		strata = []
+		for _ in range(dims):
+			order = list(range(budget))
+			rng.shuffle(order)
+			strata.append(order)
+		for k in range(budget):
+			yield [(strata[i][k] + rng.random()) / budget for i in range(dims)]
+
+
+# Sample of the points of a sweep. The unit cube points of the sampling method
+# are mapped onto the value indexes of every swept parameter, repeats of a
+# point are dropped so at most budget distinct points are returned
+def samplePoints(sweeps, sampling):
+	size = sweepSize(sweeps)
+	if sampling.budget >= size:
+		return list(sweepPoints(sweeps))
+	rng = random.Random(sampling.seed)
+	if sampling.method == 'random':
+		return [sweepPoint(sweeps, number) for number in rng.sample(range(size), sampling.budget)]
+	dims = len(sweeps)
+	if sampling.method == 'lhs':
+		sequence = latinHypercube(dims, sampling.budget, rng)
+	elif sampling.method == 'sobol' and dims <= len(sobolDirections) + 1:
+		sequence = sobolSequence(dims, rng)
+	else:
+		# Halton also covers Sobol sweeps with more dimensions than directions
+		sequence = haltonSequence(dims, rng)
+	points = {}
+	draws = 0
+	while len(points) < sampling.budget and draws < 100 * sampling.budget:
+		unit = next(sequence)
+		point = tuple(min(int(unit[i] * len(sweeps[i])), len(sweeps[i]) - 1) for i in range(dims))
+		points.setdefault(point, None)
+		draws += 1
+	return list(points)
+
+
+# Adaptive sweep: instead of every point, the sweep starts from the ends of
+# every swept range and bisects the grid where the metric still changes.
+# Each axis keeps the value indexes in use, a gap between two of them is
+# halved when the metric differs by more than tolerance (relative) between
+# the two ends for any combination of the other axes. Gaps where the metric
+# is flat are never refined, so the points inside them are pruned
+# ranges tells for every axis whether it is a range, all of them if None.
+# The other axes are lists of unrelated values, they are run in full and
+# never bisected
+class AdaptiveSweep:
+
+	def __init__(self, sweeps, tolerance, budget=None, ranges=None):
+		self.sweeps = sweeps
+		self.tolerance = tolerance
+		self.budget = budget
+		self.ranges = ranges if ranges is not None else [True] * len(sweeps)
+		self.levels = [sorted({0, len(values) - 1}) if isRange else list(range(len(values)))
+		               for values, isRange in zip(sweeps, self.ranges)]
+		self.points = []  # every point handed out, in run order
+		self.seen = set()
+		self.metrics = {} # point -> metric value, None if the run gave none
+
+
+	# Points to run next, empty once nothing is left to refine or the budget
+	# is spent. The points are added to the end of points
+	def next(self):
+		batch = [point for point in itertools.product(*self.levels) if point not in self.seen]
+		if self.budget is not None:
+			batch = batch[:max(0, self.budget - len(self.points))]
+		self.points.extend(batch)
+		self.seen.update(batch)
+		return batch
+
+
+	def update(self, point, value):
+		self.metrics[point] = value
+
+
+	# Whether the metric changes between two values
+	def changes(self, a, b):
+		if a is None or b is None:
+			return False
+		return abs(a - b) > self.tolerance * max(abs(a), abs(b))
+
+
+	# Halves the gaps of the range axes where the metric still changes,
+	# returns whether any was
+	def refine(self):
+		refined = False
+		for axis in range(len(self.levels)):
+			if not self.ranges[axis]:
+				continue
+			levels = self.levels[axis]
+			added = []
+			for low, high in zip(levels, levels[1:]):
+				if high - low < 2:
+					continue
+				for point, value in self.metrics.items():
+					if point[axis] == low:
+						other = point[:axis] + (high,) + point[axis + 1:]
+						if self.changes(value, self.metrics.get(other)):
+							added.append((low + high) // 2)
+							break
+			if added:
+				self.levels[axis] = sorted(set(levels + added))
+				refined = True
+		return refined
+
+
+	# Number of points of the full grid that were never run
+	def pruned(self):
+		return sweepSize(self.sweeps) - len(self.points)
+
+
+# Value of a metric in the log of a run. metric is the name of a statistic
+# (<component>.<statistic>.<field>, see parseRunLog), sim_s for the simulated
+# time, or a regular expression whose last match holds the number, in its
+# first group if it has one. None if the log has no such value
+def metricValue(log, metric):
+	simTime, stats = parseRunLog(log)
+	if metric == 'sim_s':
+		return simTime
+	text = stats.get(metric)
+	if text is None:
+		try:
+			pattern = re.compile(metric)
+		except re.error:
+			return None
+		match = None
+		try:
+			with open(log, 'r', errors='replace') as fp:
+				for line in fp:
+					match = pattern.search(line) or match
+		except OSError:
+			return None
+		if match is None:
+			return None
+		text = match.group(1) if pattern.groups else match.group(0)
+	number = re.search(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?', text or '')
+	return float(number.group(0)) if number else None
+
+
+# Header of a virtual sweep driver, it picks the values of its point from the
+# manifest. The point number comes from --model-options or the environment
+sweepDriver = '''# Parameter sweep driver for {test}, generated by sstSHELL.py
+# Run point N with: sst --model-options=--sweep-point=N {driver}
+# or set SST_SWEEP_POINT=N. The swept values are listed in {manifest}
+import json as _json, os as _os, sys as _sys
+with open({manifestPath!r}, 'r') as _fp:
+	_manifest = _json.load(_fp)
+_number = int(_os.getenv('SST_SWEEP_POINT', '0'))
+for _arg in _sys.argv[1:]:
+	if _arg.startswith('--sweep-point='):
+		_number = int(_arg.split('=', 1)[1])
+_sweepValues = []
+if 'points' in _manifest:
+	# A sampled sweep lists the value indexes of every point
+	_sweepValues = [_values[_i] for _values, _i in zip(_manifest['sweeps'], _manifest['points'][_number])]
+else:
+	for _values in reversed(_manifest['sweeps']):
+		_sweepValues.insert(0, _values[_number % len(_values)])
+		_number //= len(_values)
+
+'''
+
+
+# Virtual parameter sweep: instead of a test file per combination a single
+# manifest lists the swept values and a single driver config picks its point
+# at launch time, see sweepDriver. Both go in <test>_sweep so the driver is
+# not picked up as a test of its own
+# Returns the driver, the manifest and the number of points
+def virtualSweep(filename, sampling=None):
+	template = SweepTemplate(filename)
+	base = filename.split('.py')[0]
+	os.makedirs(base + '_sweep', exist_ok=True)
+	driver = base + '_sweep/driver.py'
+	manifest = base + '_sweep/manifest.json'
+	data = {'test': filename, 'names': template.names, 'sweeps': template.sweeps, 'size': template.size()}
+	if sampling is not None and sampling.method != 'grid':
+		data['points'] = [list(point) for point in template.points(sampling)]
+		data['size'] = len(data['points'])
+		data['sampling'] = sampling._asdict()
+	with open(manifest, 'w') as fp:
+		json.dump(data, fp)
+	header = sweepDriver.format(test=os.path.basename(filename), driver=os.path.basename(driver),
+	                            manifest=os.path.basename(manifest), manifestPath=os.path.abspath(manifest))
+	slots = ['_sweepValues[' + str(i) + ']' for i in range(len(template.sweeps))]
+	text = template.fill(slots)
+	# The header goes after the prologue of the test, see parseParams
+	prologue = text[:template.prologue]
+	if prologue and not prologue.endswith('\n'):
+		prologue += '\n'
+	with open(driver, 'w') as fp:
+		fp.write(prologue + header + text[template.prologue:])
+	return driver, manifest, data['size']
+
+
+# Command that runs one point of a virtual sweep
+def sweepCommand(driver, number, sst='sst '):
+	return sst + '--model-options=--sweep-point=' + str(number) + ' ' + driver
+
+
 # Parameter sweep expansion
-def paramSweep(filename):
-	List1 = []
-	List2 = []
-	List3 = []
-	List4 = []
-	List5 = []
-	found = False
-	full = False
-	# Scan through the file first to find parameters that need swept
-	with open(filename,'r') as infile:
-		for line in infile:
-			if not line.lstrip().startswith('#'): # Skip comments
-				if '.addParams' in line:
-					found = True
-				if found:
-					newline = line.strip().split(':')
-					if len(newline) >= 2:
-						value = newline[1].split('"')[1]
-						# fill up lists starting with List1
-						if not List1:
-							current = List1
-						elif not List2:
-							current = List2
-						elif not List3:
-							current = List3
-						elif not List4:
-							current = List4
-						elif not List5:
-							current = List5
-						else:
-							full = True
-						# pull out the start, end, and increment
-						if ';' in value and not full:
-							tmp = value.split(';')
-							start = int(tmp[0].split('-')[0], 0)
-							end = int(tmp[0].split('-')[1], 0)
-							index = int(tmp[1].split(' ')[0], 0)
-							for i in range(start, end+index, index):
-								units = tmp[1].split(' ')
-								if len(units) >= 2:
-									current.append(str(i) + ' ' + units[1])
-								else:
-									current.append(str(i))
-						elif ',' in value and not full:
-							current.extend(value.split(','))
-						elif full and (';' in value or ',' in value):
-							return 'ERROR: Only five (5) parameters may be expanded at a time'
-				if found and '})' in line:
-					found = False
-	found = False
+# Any number of parameters may be swept, one test file is written for every
+# combination, or every sampled point, and named <test>_<index>_<index>...py
+# points, if given, are the exact points to write in run order
+def paramSweep(filename, sampling=None, points=None):
+	template = SweepTemplate(filename)
 	path = filename.split('.py')[0] + '_expanded'
 	os.system('mkdir -p ' + path)
-	# python doesn't support do while, so these loops are simply doing that
-	i = 0
-	while(1):
-		j = 0
-		while(1):
-			k = 0
-			while(1):
-				l = 0
-				while(1):
-					m = 0
-					while(1):
-						count = 1
-						# create the filename
-						testfile = path + '/' + os.path.basename(filename).split('.')[0]
-						testfile += '_' + str(i) if List1 else ''
-						testfile += '_' + str(j) if List2 else ''
-						testfile += '_' + str(k) if List3 else ''
-						testfile += '_' + str(l) if List4 else ''
-						testfile += '_' + str(m) if List5 else ''
-						testfile += '.py'
-						with open(filename,'r') as infile, open(testfile,'w') as fptest:		   
-							for line in infile:
-								if not line.lstrip().startswith('#'): # Skip comments
-									if '.addParams' in line:
-										found = True
-									if found:
-										newline = line.split(':')
-										if len(newline) >= 2:
-											tmp = newline[1].split('"')
-											# for each file, put in the correct parameters
-											if ';' in tmp[1] or ',' in tmp[1]:
-												line = newline[0] + ': "'
-												line += List1[i] if count == 1 else ''
-												line += List2[j] if count == 2 else ''
-												line += List3[k] if count == 3 else ''
-												line += List4[l] if count == 4 else ''
-												line += List5[m] if count == 5 else ''
-												line += '"' + tmp[2]
-												count = count + 1
-									if found and '})' in line:
-										found = False
-								fptest.write(line)
-						m = m + 1
-						if m >= len(List5): break
-					l = l + 1
-					if l >= len(List4): break
-				k = k + 1
-				if k >= len(List3): break
-			j = j + 1
-			if j >= len(List2): break
-		i = i + 1
-		if i >= len(List1): break
+	name = path + '/' + os.path.basename(filename).split('.')[0]
+	rows = []
+	if os.path.exists(path + '/manifest.csv'):
+		# Clear the files of an earlier sweep, a sample may not overwrite them all
+		for test in readTable(path + '/manifest.csv', numeric=False)['file']:
+			if os.path.exists(path + '/' + test):
+				os.remove(path + '/' + test)
+	for run, point in enumerate(points if points is not None else template.points(sampling)):
+		# Each file is written with a single buffered write
+		test = name + ''.join('_' + str(i) for i in point) + '.py'
+		with open(test, 'w') as fptest:
+			fptest.write(template.render(point))
+		rows.append([run, os.path.basename(test)] + template.values(point))
+	# The manifest maps the run number to its file and parameter values
+	writeTable(path + '/manifest.csv', ['run', 'file'] + template.names, rows)
 	return path
 
 
+# Run number -> parameter values of a sweep manifest, either the manifest.csv
+# of an expanded sweep or the manifest.json of a virtual one
+def manifestParams(manifest):
+	if manifest.endswith('.json'):
+		with open(manifest, 'r') as fp:
+			data = json.load(fp)
+		sweeps = data['sweeps']
+		params = []
+		for number in range(data['size']):
+			point = data['points'][number] if 'points' in data else sweepPoint(sweeps, number)
+			params.append([sweeps[i][point[i]] for i in range(len(point))])
+		return data['names'], params
+	table = readTable(manifest, numeric=False)
+	names = [column for column in table if column not in ('run', 'file')]
+	return names, [list(row) for row in zip(*[table[name] for name in names])]
+
+
+# Writes a table as CSV, rows are lists in column order or dicts by column
+def writeTable(path, columns, rows):
+	with open(path + '.tmp', 'w', newline='') as fp:
+		if rows and isinstance(rows[0], dict):
+			writer = csv.DictWriter(fp, columns, restval='')
+			writer.writeheader()
+		else:
+			writer = csv.writer(fp)
+			writer.writerow(columns)
+		writer.writerows(rows)
+	os.replace(path + '.tmp', path)
+
+
+# Loads a CSV table written by writeTable as a dict of columns. With numeric
+# set, columns holding only numbers (or blanks) are converted to floats
+def readTable(path, numeric=True):
+	with open(path, 'r', newline='') as fp:
+		reader = csv.reader(fp)
+		columns = next(reader)
+		data = list(zip(*reader)) or [()] * len(columns)
+	table = {}
+	for column, values in zip(columns, data):
+		if numeric:
+			try:
+				values = [float(value) if value else None for value in values]
+			except ValueError:
+				pass
+		table[column] = list(values)
+	return table
+
+
+# Seconds per unit of the simulated time SST reports
+timeUnits = {'s': 1, 'ms': 1e-3, 'us': 1e-6, 'ns': 1e-9, 'ps': 1e-12, 'fs': 1e-15}
+
+
+# Pulls the simulated time (in seconds) and the console statistics out of the
+# log of a run. Statistics are named <component>.<statistic>.<field>, stats
+# is a list of regular expressions selecting which to keep, None keeps all
+def parseRunLog(log, stats=None):
+	simTime = None
+	values = {}
+	selected = [re.compile(stat) for stat in stats] if stats is not None else None
+	try:
+		with open(log, 'r', errors='replace') as fp:
+			for line in fp:
+				if 'simulated time:' in line:
+					value = line.split('simulated time:')[1].split()
+					if len(value) == 2 and value[1] in timeUnits:
+						simTime = float(value[0]) * timeUnits[value[1]]
+				elif line.count(' : ') >= 2 and ' = ' in line:
+					# <component>.<statistic> : <type> : <field>.<type> = <value>; ...
+					name, kind, fields = line.strip().split(' : ', 2)
+					for field in fields.split(';'):
+						if '=' in field:
+							field, value = field.split('=', 1)
+							column = name + '.' + field.strip().split('.')[0]
+							if selected is None or any(stat.search(column) for stat in selected):
+								values[column] = value.strip()
+	except OSError:
+		pass
+	return simTime, values
+
+
+# Columns every results table has after the run number and parameters
+resultColumns = ['exit', 'wall_s', 'sim_s', 'max_rss_kb']
+
+
+# Builds the results table of a sweep from the finished runs. statuses and
+# usage are run number -> exit status and run number -> (wall seconds, max
+# RSS in KiB) as filled by runParallel, logs are the log files of the runs
+def sweepResults(names, params, statuses, usage, logs, stats=None):
+	rows = []
+	statColumns = set()
+	for run in sorted(statuses):
+		simTime, values = parseRunLog(logs[run], stats)
+		wall, rss = usage.get(run, ('', ''))
+		row = {'run': run, 'exit': statuses[run], 'wall_s': wall, 'sim_s': '%.12g' % simTime if simTime is not None else '', 'max_rss_kb': rss}
+		row.update(zip(names, params[run]))
+		row.update(values)
+		statColumns.update(values)
+		rows.append(row)
+	return ['run'] + names + resultColumns + sorted(statColumns), rows
+
+
+# Default number of runs to execute at once, the available cores divided by
+# the number of threads each SST run uses
+def defaultJobs(threads=1):
+	if hasattr(os, 'sched_getaffinity'):
+		cores = len(os.sched_getaffinity(0))
+	else:
+		cores = os.cpu_count() or 1
+	return max(1, cores // max(1, threads))
+
+
+# Number of past runs a runtime history keeps
+runtimeHistoryLimit = 5000
+
+
+# Wall times of past runs of a model, kept in the cache as JSON lines of
+# {"params": {name: value}, "wall_s": seconds}. A model is its test file run
+# with the same sst options, the threads per run change the run times
+class RuntimeHistory:
+
+	def __init__(self, testfile, options=''):
+		key = hashlib.sha1((os.path.abspath(testfile) + '\n' + options.strip()).encode('utf-8')).hexdigest()
+		self.path = cacheDir + '/runtimes/' + key + '.jsonl'
+		self.runs = []
+		try:
+			with open(self.path, 'r') as fp:
+				for line in fp:
+					try:
+						self.runs.append(json.loads(line))
+					except ValueError:
+						pass
+		except OSError:
+			pass
+		self.runs = self.runs[-runtimeHistoryLimit:]
+
+
+	# Appends finished runs, a list of (params dict, wall seconds)
+	def record(self, runs):
+		if not runs:
+			return
+		os.makedirs(os.path.dirname(self.path), exist_ok=True)
+		records = [{'params': params, 'wall_s': wall} for params, wall in runs]
+		self.runs = (self.runs + records)[-runtimeHistoryLimit:]
+		if len(self.runs) < runtimeHistoryLimit:
+			with open(self.path, 'a') as fp:
+				fp.write(''.join(json.dumps(record) + '\n' for record in records))
+		else:
+			# Rewrite the file so it only holds the runs that are kept
+			with open(self.path + '.tmp', 'w') as fp:
+				fp.write(''.join(json.dumps(record) + '\n' for record in self.runs))
+			os.replace(self.path + '.tmp', self.path)
+
+
+# Number a parameter value stands for, with its SI or binary prefix applied
+# None if the value is not a number
+def paramNumber(value):
+	match = re.match('^' + rangeQuantity + r'(?: +(\S+))?$', value.strip())
+	if match is None:
+		return None
+	number, scale, unit, family = parseQuantity(match.group(1), match.group(2))
+	return float(number) * scale
+
+
+# Solves the linear system a x = b in place by Gauss-Jordan elimination with
+# partial pivoting, None if it is singular
+def solveLinear(a, b):
+	n = len(b)
+	for col in range(n):
+		pivot = max(range(col, n), key=lambda row: abs(a[row][col]))
+		if abs(a[pivot][col]) < 1e-12:
+			return None
+		a[col], a[pivot] = a[pivot], a[col]
+		b[col], b[pivot] = b[pivot], b[col]
+		for row in range(n):
+			if row != col and a[row][col]:
+				factor = a[row][col] / a[col][col]
+				for k in range(col, n):
+					a[row][k] -= factor * a[col][k]
+				b[row] -= factor * b[col]
+	return [b[i] / a[i][i] for i in range(n)]
+
+
+# Predicts the wall time of a run from its parameter values by least squares
+# on the runtime history. Run times tend to follow powers of the parameters,
+# so the log of the wall time is fitted to the log of every positive numeric
+# parameter, other parameters get one column per value seen. With too few
+# runs for the fit the geometric mean of the history is the prediction
+class RuntimePredictor:
+
+	def __init__(self, names, runs, ridge=1e-3):
+		self.names = names
+		self.columns = []  # (name, None) for a number, (name, value) for a category
+		self.weights = None
+		self.mean = None
+		runs = [run for run in runs if run.get('wall_s') and set(names) <= set(run['params'])]
+		if not runs:
+			return
+		targets = [math.log(max(run['wall_s'], 1e-3)) for run in runs]
+		self.mean = sum(targets) / len(targets)
+		for name in names:
+			values = [run['params'][name] for run in runs]
+			numbers = [paramNumber(value) for value in values]
+			if all(number is not None and number > 0 for number in numbers):
+				self.columns.append((name, None))
+			else:
+				self.columns.extend((name, value) for value in sorted(set(values)))
+		rows = [self.features(run['params']) for run in runs]
+		if len(rows) <= len(self.columns):
+			return
+		# Normal equations with a small ridge so repeated values do not make
+		# the system singular, the intercept is left unpenalized
+		size = len(self.columns) + 1
+		a = [[sum(row[i] * row[j] for row in rows) + (ridge if i == j and i else 0) for j in range(size)] for i in range(size)]
+		b = [sum(row[i] * target for row, target in zip(rows, targets)) for i in range(size)]
+		self.weights = solveLinear(a, b)
+
+
+	# Feature row of the parameter values, the intercept first
+	def features(self, params):
+		row = [1.0]
+		for name, value in self.columns:
+			if value is None:
+				number = paramNumber(params[name])
+				row.append(math.log(number) if number is not None and number > 0 else 0.0)
+			else:
+				row.append(1.0 if params[name] == value else 0.0)
+		return row
+
+
+	# Expected wall seconds of a run, None without any history
+	def predict(self, params):
+		if self.mean is None:
+			return None
+		if self.weights is None:
+			return math.exp(self.mean)
+		estimate = sum(w * x for w, x in zip(self.weights, self.features(params)))
+		# Keep extrapolation far outside the history in check
+		return math.exp(min(estimate, self.mean + 10))
+
+
+# Seconds until the runs left finish, given the seconds each still needs: the
+# work left spread over jobs, but never less than the longest run left
+def remainingTime(left, jobs):
+	if not left:
+		return 0
+	return max(sum(left) / max(jobs, 1), max(left))
+
+
+# Writes seconds as 1h 02m, 3m 20s or 45s
+def formatDuration(seconds):
+	seconds = int(round(seconds))
+	if seconds >= 3600:
+		return str(seconds // 3600) + 'h ' + '%02dm' % (seconds % 3600 // 60)
+	if seconds >= 60:
+		return str(seconds // 60) + 'm ' + '%02ds' % (seconds % 60)
+	return str(seconds) + 's'
+
+
+# The command of a run in sst's init mode, which builds the model from the
+# config without simulating it, as graphModel does
+def initCommand(command):
+	return command.replace('sst ', 'sst --run-mode=init ', 1)
+
+
+# Last non-empty line of a log file, to report why a run failed
+def lastLine(log):
+	try:
+		with open(log, 'r', errors='replace') as fp:
+			lines = [line.strip() for line in fp if line.strip()]
+	except OSError:
+		return ''
+	return lines[-1] if lines else ''
+
+
+# Exit status and max RSS (KiB) of a process if it has finished, using wait4
+# where the platform has it so the resource usage of the child is kept
+def reapProcess(process):
+	if process.returncode is None and hasattr(os, 'wait4'):
+		try:
+			pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+		except ChildProcessError:
+			return process.poll(), None
+		if pid == 0:
+			return None, None
+		process.returncode = os.waitstatus_to_exitcode(status)
+		return process.returncode, usage.ru_maxrss
+	return process.poll(), None
+
+
+# Peak RSS (KiB) of a running process so far, None if it is not known
+def peakMemory(pid):
+	try:
+		with open('/proc/' + str(pid) + '/status', 'r') as fp:
+			for line in fp:
+				if line.startswith('VmHWM:'):
+					return int(line.split()[1])
+	except (OSError, ValueError, IndexError):
+		pass
+	return None
+
+
+# The max RSS wait4 reports for a child starts out at the peak of its parent,
+# the kernel carries it over fork and exec, so it is only the child's own when
+# it is above the peak the parent had at launch. Otherwise the peak sampled
+# while the child ran is used, None if it finished before it was sampled
+def childPeak(rss, parentPeak, sampled):
+	if rss is not None and rss > parentPeak:
+		return rss
+	return sampled
+
+
+# Starts a command in a session of its own, so it and everything it starts
+# can be stopped together with killProcesses
+def startProcess(command, **kwargs):
+	return subprocess.Popen(command.split(), start_new_session=True, **kwargs)
+
+
+# Seconds a stopped process gets to exit before it is killed
+killGrace = 2
+
+
+# Sends sig to the process groups of processes started by startProcess that
+# have not been reaped yet (so their pid is still theirs), returns those
+def signalProcesses(processes, sig):
+	signalled = []
+	for process in processes:
+		if process.returncode is None:
+			try:
+				os.killpg(process.pid, sig)
+				signalled.append(process)
+			except OSError:
+				pass
+	return signalled
+
+
+# Stops processes started by startProcess along with their children: the
+# process groups are asked to terminate and killed if still running after
+# grace seconds. This waits for them, see signalProcesses to not wait
+def killProcesses(processes, grace=killGrace):
+	live = signalProcesses(processes, signal.SIGTERM)
+	deadline = time.monotonic() + grace
+	for process in live:
+		try:
+			process.wait(max(0, deadline - time.monotonic()))
+		except subprocess.TimeoutExpired:
+			try:
+				os.killpg(process.pid, signal.SIGKILL)
+			except OSError:
+				pass
+			process.wait()
+		except ChildProcessError:
+			pass
+
+
+# Exit status of a run stopped for taking longer than its timeout, as
+# coreutils timeout reports it
+timeoutStatus = 124
+
+
+# Runs the commands with at most jobs of them running at the same time. The
+# output of every command is written to its log file. This is a generator:
+# it yields (index, exit status) when a command finishes and (None, None)
+# every interval seconds while waiting, so the caller can stay responsive
+# If usage is a dict it is filled with index -> (wall seconds, max RSS in KiB)
+# and started, if given, is called with the index of every command it starts
+# The max RSS is left empty for a run too short to measure, see childPeak
+# A command running longer than timeout seconds is asked to stop, killed if
+# still running killGrace seconds later, and finishes with timeoutStatus
+# Closing the generator stops every command still running
+def runParallel(commands, logs, jobs, interval=0.1, usage=None, started=None, timeout=None):
+	pending = list(range(len(commands)))
+	pending.reverse()
+	running = {}
+	startTimes = {}
+	parentPeaks = {}
+	peaks = {}
+	deadlines = {} # index -> when a timed out command is killed, inf once it was
+	try:
+		while pending or running:
+			while pending and len(running) < jobs:
+				index = pending.pop()
+				os.makedirs(os.path.dirname(os.path.abspath(logs[index])), exist_ok=True)
+				with open(logs[index], 'w') as log:
+					startTimes[index] = time.monotonic()
+					parentPeaks[index] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+					running[index] = startProcess(commands[index], stdout=log, stderr=subprocess.STDOUT)
+				if started is not None:
+					started(index)
+			for index in list(running):
+				status, rss = reapProcess(running[index])
+				# A run that has only just started may still be in exec
+				if status is None and time.monotonic() - startTimes[index] >= interval:
+					peak = peakMemory(running[index].pid)
+					if peak is not None:
+						peaks[index] = max(peak, peaks.get(index, 0))
+				now = time.monotonic()
+				if status is None and timeout and index not in deadlines and now - startTimes[index] > timeout:
+					# Stopping is not waited for here, so the other runs go on
+					signalProcesses([running[index]], signal.SIGTERM)
+					deadlines[index] = now + killGrace
+				elif status is None and deadlines.get(index, math.inf) <= now:
+					signalProcesses([running[index]], signal.SIGKILL)
+					deadlines[index] = math.inf
+				if status is not None:
+					del running[index]
+					if deadlines.pop(index, None) is not None:
+						status, rss = timeoutStatus, None
+					rss = childPeak(rss, parentPeaks.pop(index), peaks.pop(index, None))
+					if usage is not None:
+						usage[index] = (round(time.monotonic() - startTimes[index], 3), rss if rss is not None else '')
+					yield index, status
+			if running:
+				time.sleep(interval)
+				yield None, None
+	finally:
+		# Stop anything still running if the caller gives up early
+		killProcesses(running.values())
+
+
+# A run log is rotated when it passes runLogLimit bytes, the runLogKeep most
+# recent rotated parts are kept as <log>.1 ... <log>.<runLogKeep>
+runLogLimit = 256 << 20
+runLogKeep = 4
+
+
+# Every logIndexStride-th line has its byte offset in the index of a log
+logIndexStride = 1024
+
+
+# Where the output of a command that has no log of its own is kept, the last
+# runLogCount of those logs are kept
+runLogCount = 200
+def runLogPath(command):
+	path = cacheDir + '/logs'
+	os.makedirs(path, exist_ok=True)
+	for old in sorted(glob.glob(path + '/*.log'))[:-runLogCount]:
+		for f in glob.glob(old + '*'):
+			os.remove(f)
+	now = time.time()
+	name = time.strftime('%Y%m%d-%H%M%S', time.localtime(now)) + '.%06d-' % (now % 1 * 1000000) + os.path.basename(command.split()[0])
+	return path + '/' + name + '.log'
+
+
+# Adds the offsets of the lines of data that start a stride of lines to
+# offsets. data starts at byte base of the log after lines lines, returns the
+# number of lines after it
+def indexLines(data, base, lines, offsets, stride=logIndexStride):
+	count = data.count(b'\n')
+	if lines // stride == (lines + count) // stride:
+		return lines + count
+	pos = data.find(b'\n')
+	while pos >= 0:
+		lines += 1
+		if lines % stride == 0:
+			offsets.append(base + pos + 1)
+		pos = data.find(b'\n', pos + 1)
+	return lines
+
+
+# Log file of a run written as the output arrives. The index of the log,
+# <log>.idx, holds the size of the log it describes and the offsets of every
+# logIndexStride-th line, so a line is found without reading the log up to it
+# Past limit bytes the log is rotated and, with compress, the rotated parts
+# are gzipped. Rotated parts that are not compressed keep their index
+class RunLog:
+
+	def __init__(self, path, limit=runLogLimit, keep=runLogKeep, compress=False):
+		self.path = path
+		self.limit = limit
+		self.keep = keep
+		self.compress = compress
+		os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+		# Parts rotated out of an earlier run of the log are not part of this one
+		for part in glob.glob(path + '.[0-9]*'):
+			os.remove(part)
+		self.open()
+
+
+	def open(self):
+		self.fp = open(self.path, 'wb')
+		self.size = 0
+		self.lines = 0
+		self.offsets = array.array('Q', [0])
+
+
+	def write(self, text):
+		if self.size >= self.limit:
+			self.rotate()
+		data = text.encode('utf-8')
+		self.fp.write(data)
+		self.lines = indexLines(data, self.size, self.lines, self.offsets)
+		self.size += len(data)
+
+
+	# Closes the log and writes its index
+	def close(self):
+		self.fp.close()
+		writeLogIndex(self.path, self.size, self.offsets)
+
+
+	# Moves every part up one number, the oldest one past keep is removed
+	def rotate(self):
+		self.close()
+		for f in glob.glob(self.path + '.' + str(self.keep) + '*'):
+			os.remove(f)
+		for number in range(self.keep - 1, 0, -1):
+			for part in glob.glob(self.path + '.' + str(number)) + glob.glob(self.path + '.' + str(number) + '.*'):
+				os.replace(part, self.path + '.' + str(number + 1) + part[len(self.path + '.' + str(number)):])
+		if self.compress:
+			with open(self.path, 'rb') as src, gzip.open(self.path + '.1.gz', 'wb', compresslevel=1) as dst:
+				shutil.copyfileobj(src, dst, 1 << 20)
+			os.remove(self.path)
+			os.remove(self.path + '.idx')
+		else:
+			os.replace(self.path, self.path + '.1')
+			os.replace(self.path + '.idx', self.path + '.1.idx')
+		self.open()
+
+
+	def __enter__(self):
+		return self
+
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+def writeLogIndex(path, size, offsets):
+	with open(path + '.idx.tmp', 'wb') as fp:
+		array.array('Q', [size]).tofile(fp)
+		offsets.tofile(fp)
+	os.replace(path + '.idx.tmp', path + '.idx')
+
+
+# The line offsets of a log, from its index if the index describes the log as
+# it is now, else indexed again (and the index written) from the mapped log
+def logIndex(path, mm):
+	try:
+		with open(path + '.idx', 'rb') as fp:
+			offsets = array.array('Q', fp.read())
+		if offsets and offsets[0] == len(mm):
+			return offsets[1:]
+	except (OSError, ValueError):
+		pass
+	offsets = array.array('Q', [0])
+	lines = 0
+	chunk = 16 << 20
+	for base in range(0, len(mm), chunk):
+		lines = indexLines(mm[base:base + chunk], base, lines, offsets)
+	try:
+		writeLogIndex(path, len(mm), offsets)
+	except OSError:
+		pass
+	return offsets
+
+
+# Opens a log read only and memory mapped, None for an empty log
+def mapLog(path):
+	with open(path, 'rb') as fp:
+		if os.fstat(fp.fileno()).st_size == 0:
+			return None
+		return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+# Number (from 1) of the line of a mapped log that holds byte offset
+def lineNumber(mm, offsets, offset):
+	stride = bisect.bisect_right(offsets, offset) - 1
+	return stride * logIndexStride + mm[offsets[stride]:offset].count(b'\n') + 1
+
+
+# count lines of a log starting at line first (from 1), or the last count
+# lines if first is None. Returns the number of the first line and the lines
+def logLines(path, first=None, count=100):
+	mm = mapLog(path)
+	if mm is None:
+		return 1, []
+	with mm:
+		offsets = logIndex(path, mm)
+		if first is None:
+			# Count back from the end, the index gives the lines in each stride
+			lines = (len(offsets) - 1) * logIndexStride + mm[offsets[-1]:].count(b'\n')
+			if not mm[-1:] == b'\n':
+				lines += 1
+			first = max(1, lines - count + 1)
+		stride = min((first - 1) // logIndexStride, len(offsets) - 1)
+		pos = offsets[stride]
+		for skip in range(first - 1 - stride * logIndexStride):
+			pos = mm.find(b'\n', pos) + 1
+			if pos == 0:
+				return first, []
+		text = []
+		while len(text) < count and pos < len(mm):
+			end = mm.find(b'\n', pos)
+			end = len(mm) if end < 0 else end + 1
+			text.append(mm[pos:end].decode('utf-8', 'replace'))
+			pos = end
+		return first, text
+
+
+# Searches a log for a regular expression without reading it into memory,
+# plain logs are memory mapped and gzipped parts are read as a stream. Returns
+# up to limit (line number, line) matches and whether there were more
+def searchLog(path, pattern, limit=1000):
+	regex = re.compile(pattern.encode('utf-8'), re.MULTILINE)
+	matches = []
+	if path.endswith('.gz'):
+		with gzip.open(path, 'rb') as fp:
+			for number, line in enumerate(fp, 1):
+				if regex.search(line):
+					if len(matches) == limit:
+						return matches, True
+					matches.append((number, line.decode('utf-8', 'replace')))
+		return matches, False
+	mm = mapLog(path)
+	if mm is None:
+		return matches, False
+	with mm:
+		offsets = logIndex(path, mm)
+		pos = 0
+		while pos < len(mm):
+			match = regex.search(mm, pos)
+			if match is None:
+				break
+			if len(matches) == limit:
+				return matches, True
+			start = mm.rfind(b'\n', 0, match.start()) + 1
+			end = mm.find(b'\n', match.start())
+			end = len(mm) if end < 0 else end + 1
+			matches.append((lineNumber(mm, offsets, start), mm[start:end].decode('utf-8', 'replace')))
+			pos = end
+	return matches, False
+
+
+# Default size bound of the result cache in bytes
+resultCacheLimit = 1 << 30
+
+
+# Content-addressed cache of SST runs. A run is keyed on the text of its
+# config, its sst options, the SST install and every registered element
+# library, so a run is only reused when none of them changed. Each entry is
+# the log of the run and a JSON file of its exit status and resource usage,
+# the least recently used entries are evicted past limit bytes
+class ResultCache:
+
+	def __init__(self, path=cacheDir + '/results', limit=resultCacheLimit):
+		self.path = path
+		self.limit = limit
+		self.total = None # bytes in the cache, counted on the first store
+		self.base = catalogKey() + ';' + fileStamp(shutil.which('sst') or 'sst')
+
+
+	# Key of a run from its config text and the sst options it runs with
+	def key(self, config, options=''):
+		key = hashlib.sha1((self.base + '\n' + options.strip() + '\n').encode('utf-8'))
+		key.update(config.encode('utf-8'))
+		return key.hexdigest()
+
+
+	# Copies the cached output of a run to log and returns its exit status and
+	# usage, None if the run is not cached
+	def get(self, key, log):
+		entry = self.path + '/' + key
+		try:
+			with open(entry + '.json', 'r') as fp:
+				meta = json.load(fp)
+			os.makedirs(os.path.dirname(os.path.abspath(log)), exist_ok=True)
+			shutil.copyfile(entry + '.log', log)
+			# The modification time orders the entries for eviction
+			os.utime(entry + '.json')
+		except (OSError, ValueError):
+			return None
+		return meta
+
+
+	# Stores the log of a finished run with its exit status and usage
+	def put(self, key, log, meta):
+		entry = self.path + '/' + key
+		os.makedirs(self.path, exist_ok=True)
+		shutil.copyfile(log, entry + '.log.tmp')
+		os.replace(entry + '.log.tmp', entry + '.log')
+		with open(entry + '.json.tmp', 'w') as fp:
+			json.dump(meta, fp)
+		os.replace(entry + '.json.tmp', entry + '.json')
+		if self.total is None:
+			self.total = sum(size for mtime, size, entry in self.entries())
+		else:
+			self.total += os.path.getsize(entry + '.log') + os.path.getsize(entry + '.json')
+		if self.total > self.limit:
+			self.evict()
+
+
+	# (last use, bytes, entry) of everything in the cache
+	def entries(self):
+		entries = []
+		for meta in glob.glob(self.path + '/*.json'):
+			entry = meta[:-5]
+			try:
+				entries.append((os.path.getmtime(meta), os.path.getsize(meta) + os.path.getsize(entry + '.log'), entry))
+			except OSError:
+				pass
+		return entries
+
+
+	# Removes the least recently used entries until the cache fits its limit
+	def evict(self):
+		entries = sorted(self.entries())
+		self.total = sum(size for mtime, size, entry in entries)
+		for mtime, size, entry in entries:
+			if self.total <= self.limit:
+				break
+			for f in (entry + '.json', entry + '.log'):
+				if os.path.exists(f):
+					os.remove(f)
+			self.total -= size
+
+
+# Append-only journal of the runs of a sweep, one JSON record per line:
+# {"run": <number>, "state": "queued" | "running" | "done" | "failed", ...}
+# A finished run also records its exit status and usage. The first line
+# identifies the sweep, a journal of another sweep is set aside as .old.
+# Records are flushed as they are written and finished runs are synced to
+# disk, a line cut short by a crash is dropped when the journal is opened
+class RunJournal:
+
+	def __init__(self, path, sweep):
+		self.path = path
+		self.states = {}   # run -> last record of the run
+		self.failures = {} # run -> number of failed attempts
+		records = []
+		end = 0 # bytes up to the end of the last whole line
+		try:
+			with open(path, 'rb') as fp:
+				for line in fp:
+					if not line.endswith(b'\n'):
+						break
+					end += len(line)
+					try:
+						records.append(json.loads(line))
+					except ValueError:
+						pass
+		except OSError:
+			pass
+		if records and records[0].get('sweep') == sweep:
+			for record in records[1:]:
+				if 'run' in record:
+					self.states[record['run']] = record
+					if record['state'] == 'failed':
+						self.failures[record['run']] = self.failures.get(record['run'], 0) + 1
+			self.fp = open(path, 'a')
+			# Records appended to a cut short line would be lost with it
+			self.fp.truncate(end)
+		else:
+			if records:
+				os.replace(path, path + '.old')
+			os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+			self.fp = open(path, 'w')
+			self.write({'sweep': sweep})
+
+
+	def write(self, record, sync=False):
+		self.fp.write(json.dumps(record) + '\n')
+		self.fp.flush()
+		if sync:
+			os.fsync(self.fp.fileno())
+
+
+	# Records the new state of a run, a done or failed run records its exit
+	# status, wall time and max RSS
+	def record(self, run, state, status=None, usage=None):
+		record = {'run': run, 'state': state}
+		if status is not None:
+			record['exit'] = status
+		if usage is not None:
+			record['wall_s'], record['max_rss_kb'] = usage
+		self.states[run] = record
+		if state == 'failed':
+			self.failures[run] = self.failures.get(run, 0) + 1
+		self.write(record, state in ('done', 'failed'))
+
+
+	# Records the state of many runs at once
+	def recordAll(self, runs, state):
+		self.fp.write(''.join(json.dumps({'run': run, 'state': state}) + '\n' for run in runs))
+		self.fp.flush()
+		for run in runs:
+			self.states[run] = {'run': run, 'state': state}
+
+
+	# Runs of the sweep that are finished: done, or failed more than retries
+	# times. Queued and running runs never finished and have to run again
+	def finished(self, retries=0):
+		return [run for run, record in self.states.items()
+			if record['state'] == 'done' or (record['state'] == 'failed' and self.failures[run] > retries)]
+
+
+	def close(self):
+		self.fp.close()
+
+
+# Identity of a sweep for its journal, the runs and the configs they run
+def sweepKey(commands, configs):
+	key = hashlib.sha1()
+	for command, config in zip(commands, configs):
+		key.update((command + '\n').encode('utf-8'))
+		key.update(hashlib.sha1(config.encode('utf-8')).digest())
+	return key.hexdigest()
+
+
 # Graph a Model using the python test script
 def graphModel(test):
+	commands, env, files = graphCommands(test)
+	for command in commands:
+		try:
+			subprocess.run(command.split(), env=dict(os.environ, **env))
+		except OSError as error:
+			print(error)
+			continue
+		graphRename(command)
+	return files
+
+
+# Graphing tools used on the .dot file of a model
+graphTools = ['neato', 'twopi', 'circo', 'fdp', 'dot']
+
+
+# The commands that graph a model, the extra environment they run with and
+# the files they create: sst writes the .dot file of the model and every
+# graphviz tool draws it, see graphRename for the names of the drawings
+def graphCommands(test):
 	path = os.path.dirname(test) + '/graphs'
 	name = os.path.basename(test).replace('.py','')
 	os.makedirs(path, exist_ok=True)
 	filename = path + '/' + name
-	os.system('PYTHONPATH=$PYTHONPATH:' + path + ' sst --output-dot=' + filename + '.dot --run-mode=init ' + test)
+	env = {'PYTHONPATH': os.getenv('PYTHONPATH', '') + ':' + path}
+	commands = ['sst --output-dot=' + filename + '.dot --run-mode=init ' + test]
 	# Convert .dot file to a .svg file using multiple graphing tools
-	convert = ['neato', 'twopi', 'circo', 'fdp', 'dot']
 	files = ''
-	for tool in convert:
-		os.system(tool + ' -Tsvg ' + filename + '.dot -O')
-		if not tool == 'dot':
-			os.system('mv ' + filename + '.dot.svg ' + filename + '.' + tool + '.svg')
-			os.system('mv ' + filename + '.dot.2.svg ' + filename + '.' + tool + '.2.svg')
+	for tool in graphTools:
+		commands.append(tool + ' -Tsvg ' + filename + '.dot -O')
 		files += filename + '.' + tool + '.svg ' + filename + '.' + tool + '.2.svg '
-	return str(filename + '.dot ' + files.rstrip())
+	return commands, env, str(filename + '.dot ' + files.rstrip())
+
+
+# Every graphviz tool writes <name>.dot.svg (and .dot.2.svg), after one runs
+# its drawings are renamed <name>.<tool>.svg
+def graphRename(command):
+	tool = command.split()[0]
+	if tool in graphTools and tool != 'dot':
+		dot = command.split()[2]
+		for suffix in ('.svg', '.2.svg'):
+			if os.path.exists(dot + suffix):
+				os.replace(dot + suffix, dot[:-len('.dot')] + '.' + tool + suffix)
 
 
 # Convert a model into a template
@@ -358,6 +1692,407 @@ def model2Template(model, template):
 	return f
 	
 
+# Returns the install prefix of the sst-info found on the PATH
+def sstPrefix():
+	info = shutil.which('sst-info')
+	if info:
+		return os.path.dirname(os.path.dirname(os.path.realpath(info)))
+	return ''
+
+
+# Returns the sstsimulator.conf files that SST reads element registrations from
+def sstConfigFiles():
+	files = [sstPrefix() + '/etc/sst/sstsimulator.conf', os.path.expanduser('~/.sst/sstsimulator.conf')]
+	return [f for f in files if os.path.isfile(f)]
+
+
+# Returns the directories SST searches for element libraries
+def elementLibDirs():
+	dirs = [sstPrefix() + '/lib/sstcore']
+	# sst-register adds a <name>_LIBDIR=<path> entry for every library
+	for conf in sstConfigFiles():
+		with open(conf, 'r') as fp:
+			for line in fp:
+				key, sep, value = line.partition('=')
+				if sep and key.strip().endswith('_LIBDIR'):
+					dirs.append(value.strip())
+	dirs.extend(d for d in os.getenv('SST_LIB_PATH', '').split(':') if d)
+	return dirs
+
+
+# Path, mtime and size of a file, used to notice when it has changed
+def fileStamp(f):
+	try:
+		st = os.stat(f)
+		return f + ':' + str(st.st_mtime_ns) + ':' + str(st.st_size)
+	except OSError:
+		return f + ':missing'
+
+
+# Fingerprint of the SST install itself. When this changes every element
+# library has to be queried again
+def coreKey():
+	return fileStamp(shutil.which('sst-info') or 'sst-info') + ';' + os.getenv('SST_LIB_PATH', '')
+
+
+# Fingerprint of every registered element library, element name -> stamp of
+# lib<element>.so. Moving or re-registering a library changes its path
+def libraryStamps():
+	stamps = {}
+	for d in elementLibDirs():
+		for f in sorted(glob.glob(d + '/lib*.so')):
+			name = os.path.basename(f)[3:-3]
+			# SST loads the first library found with a name
+			if name not in stamps:
+				stamps[name] = fileStamp(f)
+	return stamps
+
+
+# Fingerprint of the SST install and every registered element library
+# Only file metadata is read so computing the key is cheap
+def catalogKey():
+	stamps = libraryStamps()
+	key = hashlib.sha1(coreKey().encode('utf-8'))
+	for name in sorted(stamps):
+		key.update((name + '=' + stamps[name] + '\n').encode('utf-8'))
+	return key.hexdigest()
+
+
+# Reads the library stamps the cached catalog was built from
+def readCatalogState():
+	try:
+		with open(cacheDir + '/sstinfo.json', 'r') as fp:
+			return json.load(fp)
+	except (OSError, ValueError):
+		return None
+
+
+# Reads the cached catalog XML
+def readCatalogCache():
+	try:
+		return ET.parse(cacheDir + '/sstinfo.xml').getroot()
+	except (OSError, ET.ParseError):
+		return None
+
+
+# Writes the catalog XML and the library stamps to the cache
+# Temporary files are used so an interrupted write never leaves a bad cache
+def writeCatalogCache(root, state):
+	os.makedirs(cacheDir, exist_ok=True)
+	ET.ElementTree(root).write(cacheDir + '/sstinfo.xml.tmp', encoding='utf-8', xml_declaration=True)
+	with open(cacheDir + '/sstinfo.json.tmp', 'w') as fp:
+		json.dump(state, fp)
+	os.replace(cacheDir + '/sstinfo.xml.tmp', cacheDir + '/sstinfo.xml')
+	os.replace(cacheDir + '/sstinfo.json.tmp', cacheDir + '/sstinfo.json')
+
+
+# Tags in the sst-info XML that are never used by the catalog
+unusedTags = ['PortValidEvent']
+
+
+# Runs sst-info for the given element libraries, or all of them. The XML is
+# parsed incrementally while sst-info writes it, so the raw output is never
+# held in memory, and nodes that are never used (DEPRECATED parameters and
+# unusedTags) are dropped as soon as they have been read
+def queryElements(names=[]):
+	process = subprocess.Popen(['sst-info', '-qnxo', '/dev/stdout'] + names, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+	try:
+		parser = ET.iterparse(process.stdout, events=('start', 'end'))
+		parents = []
+		for event, node in parser:
+			if event == 'start':
+				parents.append(node)
+				continue
+			parents.pop()
+			if node.tag in unusedTags or (node.tag == 'Parameter' and 'DEPRECATED' in node.get('Description', '')):
+				parents[-1].remove(node)
+		return parser.root
+	finally:
+		process.stdout.close()
+		process.wait()
+
+
+# Brings the cached sst-info XML catalog up to date. Only the element
+# libraries that are new, whose lib<element>.so or registration changed, or
+# that are listed in refresh are queried from sst-info and merged into the
+# cache. Everything is queried again if the SST install itself has changed
+# Returns the XML root, the updated <Element> nodes and the removed element
+# names. The updated nodes are None when the whole catalog was rebuilt. If
+# nothing changed and loadRoot is False the cached XML is not even parsed
+def updateElementInfo(refresh=[], loadRoot=True):
+	state = {'core': coreKey(), 'libs': libraryStamps()}
+	cached = readCatalogState()
+	if cached is None or cached.get('core') != state['core']:
+		return rebuildElementInfo(state)
+	changed = [name for name in state['libs'] if cached['libs'].get(name) != state['libs'][name]]
+	changed += [name for name in refresh if name in state['libs'] and name not in changed]
+	removed = [name for name in cached['libs'] if name not in state['libs']]
+	if not changed and not removed and not loadRoot:
+		return None, [], []
+	root = readCatalogCache()
+	if root is None:
+		return rebuildElementInfo(state)
+	if not changed and not removed:
+		return root, [], []
+	updated = []
+	if changed:
+		try:
+			updated = queryElements(changed).findall('Element')
+		except ET.ParseError:
+			# sst-info could not handle the partial query, rebuild everything
+			return rebuildElementInfo(state)
+	# A library that sst-info no longer reports is dropped from the catalog
+	found = [node.get('Name') for node in updated]
+	removed += [name for name in changed if name not in found]
+	for node in root.findall('Element'):
+		if node.get('Name') in found or node.get('Name') in removed:
+			root.remove(node)
+	for node in updated:
+		root.append(node)
+	writeCatalogCache(root, state)
+	return root, updated, removed
+
+
+# Queries every element library and replaces the cached catalog
+def rebuildElementInfo(state):
+	root = queryElements()
+	writeCatalogCache(root, state)
+	return root, None, []
+
+
+# Returns the parsed sst-info XML catalog. sst-info is only run for the
+# element libraries that changed since the cached copy was written
+def loadElementInfo(refresh=[]):
+	return updateElementInfo(refresh)[0]
+
+
+# Indexed, in-memory copy of the sst-info element catalog
+# Each component and subcomponent is stored once as a dictionary of its XML
+# attributes, with lists of its Parameter, Port, Statistic and SubComponentSlot
+# attributes. Hash indexes on element, name and interface replace the linear
+# ElementTree searches
+class ElementCatalog:
+
+	def __init__(self, root=None):
+		self.elements = {}   # element name -> element attributes and component names
+		self.entries = {}    # (element, name) -> component or subcomponent
+		self.names = {}      # name -> components and subcomponents with that name
+		self.interfaces = {} # interface -> subcomponents implementing it
+		self.slots = {}      # interface -> components with a slot for it
+		self.helpPages = {}  # (element, name, details) -> rendered help text
+		self.search = None   # CatalogSearch, built by searchIndex
+		if root is not None:
+			for element in root.findall('Element'):
+				self.addElement(element)
+
+
+	# Index an <Element> node from the sst-info XML, replacing any older copy
+	def addElement(self, node):
+		name = node.get('Name')
+		self.removeElement(name)
+		element = dict(node.attrib)
+		element['Component'] = []
+		element['SubComponent'] = []
+		self.elements[name] = element
+		for child in node:
+			if child.tag == 'Component' or child.tag == 'SubComponent':
+				entry = dict(child.attrib)
+				entry['Kind'] = child.tag
+				entry['Element'] = name
+				for info in ['Parameter', 'Port', 'Statistic', 'SubComponentSlot']:
+					entry[info] = [dict(item.attrib) for item in child.findall(info)]
+				element[child.tag].append(entry['Name'])
+				self.entries[(name, entry['Name'])] = entry
+				self.names.setdefault(entry['Name'], []).append(entry)
+				if child.tag == 'SubComponent':
+					self.interfaces.setdefault(entry.get('Interface'), []).append(entry)
+				for interface in set(slot.get('Interface') for slot in entry['SubComponentSlot']):
+					self.slots.setdefault(interface, []).append(entry)
+
+
+	# Drop an element and all of its components from the indexes
+	def removeElement(self, name):
+		self.search = None
+		for page in [page for page in self.helpPages if page[0] == name]:
+			del self.helpPages[page]
+		element = self.elements.pop(name, None)
+		if element is None:
+			return
+		for comp in element['Component'] + element['SubComponent']:
+			entry = self.entries.pop((name, comp))
+			self.names[comp].remove(entry)
+			if not self.names[comp]:
+				del self.names[comp]
+			if entry['Kind'] == 'SubComponent':
+				self.interfaces[entry.get('Interface')].remove(entry)
+			for interface in set(slot.get('Interface') for slot in entry['SubComponentSlot']):
+				self.slots[interface].remove(entry)
+
+
+	# Copy of the indexes that can be updated without changing this catalog
+	# The component entries themselves are shared
+	def copy(self):
+		catalog = ElementCatalog()
+		catalog.elements = dict(self.elements)
+		catalog.entries = dict(self.entries)
+		catalog.names = {name: list(entries) for name, entries in self.names.items()}
+		catalog.interfaces = {name: list(entries) for name, entries in self.interfaces.items()}
+		catalog.slots = {name: list(entries) for name, entries in self.slots.items()}
+		catalog.helpPages = dict(self.helpPages)
+		return catalog
+
+
+	# Components (or subcomponents) of an element
+	def components(self, element, kind='Component'):
+		if element not in self.elements:
+			return []
+		return [self.entries[(element, name)] for name in self.elements[element][kind]]
+
+
+	# Look up a component or subcomponent by name. The entry in the given
+	# element is preferred, otherwise the first one registered with that name
+	def find(self, name, element=None, kind=None):
+		entry = self.entries.get((element, name))
+		if entry is not None and (kind is None or entry['Kind'] == kind):
+			return entry
+		for entry in self.names.get(name, []):
+			if kind is None or entry['Kind'] == kind:
+				return entry
+		return None
+
+
+	# Parameters of a component without the DEPRECATED ones
+	def params(self, entry):
+		return [param for param in entry['Parameter'] if 'DEPRECATED' not in param.get('Description')]
+
+
+	# Slots of a component that the subcomponent fits in
+	def slotsFor(self, component, subcomponent):
+		return [slot for slot in component['SubComponentSlot'] if slot.get('Interface') == subcomponent.get('Interface')]
+
+
+	# Subcomponents that fit in any of the slots of a component
+	def compatible(self, component):
+		subs = []
+		seen = set()
+		for slot in component['SubComponentSlot']:
+			for sub in self.interfaces.get(slot.get('Interface'), []):
+				if id(sub) not in seen:
+					seen.add(id(sub))
+					subs.append(sub)
+		return subs
+
+
+	# Search index over the catalog, built on first use
+	def searchIndex(self):
+		if self.search is None:
+			self.search = CatalogSearch(self)
+		return self.search
+
+
+	# Help text for an element, component or subcomponent in the style of the
+	# sst-info output. Without details only the description lines are given,
+	# for an element that is one line per component and subcomponent
+	def help(self, element, name=None, details=False):
+		page = (element, name, details)
+		if page not in self.helpPages:
+			if element not in self.elements:
+				text = 'No element named ' + element + ' is registered with SST\n'
+			elif name is None:
+				info = self.elements[element]
+				text = 'ELEMENT ' + element + ' (' + info.get('Description', '') + ')\n'
+				for entry in self.components(element) + self.components(element, 'SubComponent'):
+					text += self.entryHelp(entry, details)
+			elif (element, name) in self.entries:
+				text = self.entryHelp(self.entries[(element, name)], details)
+			else:
+				text = 'No component named ' + element + '.' + name + ' is registered with SST\n'
+			self.helpPages[page] = text
+		return self.helpPages[page]
+
+
+	# Help text for a single component or subcomponent
+	def entryHelp(self, entry, details):
+		text = '   ' + entry['Kind'].upper() + ' ' + entry['Element'] + '.' + entry['Name']
+		text += ' (' + entry.get('Description', '') + ')\n'
+		if not details:
+			return text
+		if entry['Kind'] == 'SubComponent':
+			text += '      Interface: ' + entry.get('Interface', '') + '\n'
+		params = self.params(entry)
+		sections = [
+			('Parameters', [p['Name'] + ': ' + p.get('Description', '') + ' [' + p.get('Default', '') + ']' for p in params]),
+			('Ports', [p['Name'] + ': ' + p.get('Description', '') for p in entry['Port']]),
+			('Statistics', [s['Name'] + ': ' + s.get('Description', '') + ' [' + s.get('Units', '') + ', enable level ' + s.get('EnableLevel', '') + ']' for s in entry['Statistic']]),
+			('SubComponentSlots', [s['Name'] + ': ' + s.get('Description', '') + ' [' + s.get('Interface', '') + ']' for s in entry['SubComponentSlot']])]
+		for title, lines in sections:
+			text += '      ' + title + ' (' + str(len(lines)) + ' total)\n'
+			for line in lines:
+				text += '         ' + line + '\n'
+		return text
+
+
+# Trigram index over the names, descriptions, parameter names, port names and
+# slot interfaces of every component and subcomponent in a catalog
+class CatalogSearch:
+
+	def __init__(self, catalog):
+		self.keys = []   # document number -> (element, name)
+		self.texts = []  # document number -> lower case searchable text
+		self.grams = {}  # trigram -> document numbers containing it
+		self.last = ('', None)
+		for key, entry in catalog.entries.items():
+			fields = [entry['Name'], entry.get('Description', ''), entry.get('Interface', '')]
+			fields += [param['Name'] for param in entry['Parameter']]
+			fields += [port['Name'] for port in entry['Port']]
+			fields += [slot.get('Interface', '') for slot in entry['SubComponentSlot']]
+			text = '\n'.join(fields).lower()
+			doc = len(self.keys)
+			self.keys.append(key)
+			self.texts.append(text)
+			for gram in set(text[i:i + 3] for i in range(len(text) - 2)):
+				self.grams.setdefault(gram, set()).add(doc)
+
+
+	# Keys (element, name) of the entries whose text contains the query
+	# Queries usually grow one keystroke at a time, so a query containing the
+	# previous one only has to check the previous matches
+	def find(self, query):
+		query = query.lower()
+		if not query:
+			return set()
+		if self.last[1] is not None and self.last[0] in query:
+			candidates = self.last[1]
+		elif len(query) >= 3:
+			postings = sorted((self.grams.get(query[i:i + 3], set()) for i in range(len(query) - 2)), key=len)
+			candidates = postings[0].intersection(*postings[1:])
+		else:
+			candidates = range(len(self.texts))
+		matches = [doc for doc in candidates if query in self.texts[doc]]
+		self.last = (query, matches)
+		return set(self.keys[doc] for doc in matches)
+
+
+# Returns the indexed element catalog
+def loadCatalog():
+	return ElementCatalog(loadElementInfo())
+
+
+# Returns an up to date copy of the catalog. Only the element libraries that
+# changed (see updateElementInfo) are parsed and indexed again, the rest of
+# the catalog is shared with the old copy, which is left untouched
+def refreshCatalog(catalog, refresh=[]):
+	root, updated, removed = updateElementInfo(refresh, not catalog.elements)
+	if updated is None or not catalog.elements:
+		return ElementCatalog(root)
+	catalog = catalog.copy()
+	for name in removed:
+		catalog.removeElement(name)
+	for node in updated:
+		catalog.addElement(node)
+	return catalog
+
+
 # Runs a command and returns the output when the command has completed
 def runCommand(command):
 	return subprocess.run(command.split(), stdout=subprocess.PIPE, stderr=subprocess.STDOUT).stdout.decode('utf-8')
@@ -366,7 +2101,7 @@ def runCommand(command):
 ##### Main Function
 if __name__ == '__main__':
 	parser = argparse.ArgumentParser(formatter_class=argparse.RawTextHelpFormatter)
-	parser.add_argument('function', help='The function you wish to run\n\n', choices=['create','connect','subcomponent','convert','graph', 'sweep'])
+	parser.add_argument('function', help='The function you wish to run\n\n', choices=['create','connect','subcomponent','convert','graph', 'sweep', 'search'])
 	parser.add_argument('param',
 			help=str('Function       | Help\n' + 
 					 '---------------+--------------------------------------------------\n' + 
@@ -374,20 +2109,31 @@ if __name__ == '__main__':
 					 'Subcomponent   | Name of the subcomponent to create\n' + 
 					 'Param Sweep    | The path to the python test file\n' + 
 					 'Graph          | The path to the python test file\n' +
-					 'Convert        | The path to the model\n'))
+					 'Convert        | The path to the model\n' +
+					 'Search         | The path to the log file\n'))
 	parser.add_argument('-a', '--args',
 			help=str('Function       | Help\n' + 
 					 '---------------+--------------------------------------------------\n' + 
 					 'Create         | The path to the template\n' + 
 					 'Connect        | The components you want to connect\n' + 
-					 '               | Format is <element>.<component>.<subcomponent>,<subcomponent>;\n' + 
+					 '               | Format is <element>.<component>.<subcomponent>,<subcomponent>*<count>;\n' + 
+					 '               | The subcomponents and *<count> are optional\n' + 
 					 'Subcomponent   | The name of the subcomponent class\n' + 
-					 'Convert        | The destination template name\n'))
+					 'Convert        | The destination template name\n' +
+					 'Search         | The regular expression, the end of the log is shown without one\n'))
 	parser.add_argument('-p', '--path',
 			help=str('Function       | Help\n' + 
 					 '---------------+--------------------------------------------------\n' + 
 					 'Create/Connect | The path where the model will be created\n' + 
 					 'Subcomponent   | The path to the header file with the subcomponent definition\n'))
+	parser.add_argument('-v', '--virtual', action='store_true',
+			help='Param Sweep: write one manifest and driver config instead of a test file per point')
+	parser.add_argument('-s', '--sampling', choices=samplingMethods, default='grid',
+			help='Param Sweep: run every combination (grid) or a sample of them')
+	parser.add_argument('-b', '--budget', type=int, default=200,
+			help='Param Sweep: number of points a sampled sweep runs')
+	parser.add_argument('--seed', type=int, default=0,
+			help='Param Sweep: seed of a sampled sweep')
 	args = parser.parse_args()
 	if args.function == 'create':
 		createModel(args.param, args.args, args.path)
@@ -400,5 +2146,25 @@ if __name__ == '__main__':
 	elif args.function == 'graph':
 		graphModel(args.param)
 	elif args.function == 'sweep':
-		paramSweep(args.param)
+		sampling = Sampling(args.sampling, args.budget, args.seed)
+		try:
+			sweeps = findSweeps(args.param)
+		except ValueError as error:
+			parser.error(str(error))
+		if args.virtual:
+			driver, manifest, size = virtualSweep(args.param, sampling)
+			print('Wrote ' + manifest + ' with ' + str(size) + ' points, run point N with:')
+			print(sweepCommand(driver, 'N'))
+		else:
+			print('Expanding ' + str(sweepSize(sweeps, sampling)) + ' test files into ' + paramSweep(args.param, sampling))
+	elif args.function == 'search':
+		if args.args:
+			matches, more = searchLog(args.param, args.args)
+		else:
+			first, lines = logLines(args.param)
+			matches, more = list(enumerate(lines, first)), False
+		for number, line in matches:
+			print(str(number) + ': ' + line, end='')
+		if more:
+			print('Only the first ' + str(len(matches)) + ' matching lines are shown')
 
@@ -11,8 +11,12 @@ import os
 import subprocess
 import glob
 import html
-from datetime import datetime
-import xml.etree.ElementTree as ET
+import collections
+import shutil
+import time
+import codecs
+import re
+import signal
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
@@ -24,6 +28,387 @@ guiDir = os.path.dirname(os.path.abspath(__file__))
 Ui_MainWindow, QtBaseClass = uic.loadUiType(guiDir + '/resources/sstGUI.ui',
                                             from_imports=True, import_from='resources')
 
+####################################################################################
+##### Loads the sst-info element catalog on a worker thread so the GUI never
+##### waits on sst-info or the XML parse
+class CatalogLoader(QThread):
+	loaded = pyqtSignal(object)
+	failed = pyqtSignal(str)
+
+	def __init__(self, parent=None):
+		QThread.__init__(self, parent)
+		self.key = None
+		self.catalog = sstSHELL.ElementCatalog()
+		self.refresh = []
+
+	# Only hand over a new catalog when the SST install or libraries changed
+	# Libraries in refresh are queried again even if they look unchanged
+	# A load that fails (no sst-info, broken XML) is reported and tried again
+	# the next time the loader runs
+	def run(self):
+		refresh = []
+		try:
+			key = sstSHELL.catalogKey()
+			if key != self.key or self.refresh:
+				refresh = self.refresh[:]
+				del self.refresh[:len(refresh)]
+				catalog = sstSHELL.refreshCatalog(self.catalog, refresh)
+				# Build the search index here so searching never has to wait for it
+				catalog.searchIndex()
+				self.key = key
+				self.catalog = catalog
+				self.loaded.emit(self.catalog)
+		except Exception as error:
+			self.refresh[:0] = refresh
+			self.failed.emit(type(error).__name__ + ': ' + str(error))
+
+##### Catalog Loader Class End
+####################################################################################
+
+
+####################################################################################
+##### Reads the output of a running command on a worker thread and hands it
+##### over a chunk at a time, so the GUI keeps running while the command does
+class OutputReader(QThread):
+	output = pyqtSignal(object)
+
+	def __init__(self, stream, parent=None):
+		QThread.__init__(self, parent)
+		self.stream = stream
+
+	# Emits the lines of every chunk read, the last line of a chunk may be
+	# the start of a line that continues in the next chunk
+	def run(self):
+		decoder = codecs.getincrementaldecoder('utf-8')('replace')
+		while True:
+			data = os.read(self.stream.fileno(), 65536)
+			text = decoder.decode(data, not data)
+			if text:
+				self.output.emit(text.splitlines(True))
+			if not data:
+				break
+
+##### Output Reader Class End
+####################################################################################
+
+
+####################################################################################
+##### Runs commands in parallel with sstSHELL.runParallel on a worker thread, so
+##### waiting on them and stopping them never holds up the GUI
+class ParallelRunner(QThread):
+	runStarted = pyqtSignal(int)
+	runFinished = pyqtSignal(int, int, object)
+	failed = pyqtSignal(str)
+
+	def __init__(self, commands, logs, jobs, timeout=None, parent=None):
+		QThread.__init__(self, parent)
+		self.commands = commands
+		self.logs = logs
+		self.jobs = jobs
+		self.timeout = timeout
+		self.stopping = False
+
+	# Emits the index of every command started and the index, exit status
+	# and usage of every command that finished. Closing runParallel stops the
+	# commands still running when stop is called or running them failed, an
+	# error escaping the thread would abort the GUI so it is emitted instead
+	def run(self):
+		usage = {}
+		runs = sstSHELL.runParallel(self.commands, self.logs, self.jobs, usage=usage,
+		                            started=self.runStarted.emit, timeout=self.timeout)
+		try:
+			for index, status in runs:
+				if self.stopping:
+					break
+				if index is not None:
+					self.runFinished.emit(index, status, usage[index])
+		except Exception as error:
+			self.failed.emit(type(error).__name__ + ': ' + str(error))
+		finally:
+			runs.close()
+
+	def stop(self):
+		self.stopping = True
+
+##### Parallel Runner Class End
+####################################################################################
+
+
+####################################################################################
+##### Tree models for the Available and Selected Components views
+
+# A row in a component tree. children stays None until the row is expanded
+class ComponentNode:
+
+	def __init__(self, name, parent=None, row=0, entry=None):
+		self.name = name
+		self.parent = parent
+		self.row = row
+		self.entry = entry
+		self.children = None
+
+
+	# Name of a child, children are nodes or shared catalog entries
+	def childName(self, row):
+		child = self.children[row]
+		if isinstance(child, ComponentNode):
+			return child.name
+		return child['Name']
+
+
+# Tree of element -> component -> subcomponent rows. Every index points at the
+# node that holds its row (its parent node), which lets a row be a catalog
+# entry that is shared between many parents instead of a node of its own
+class ComponentTreeModel(QAbstractItemModel):
+
+	def __init__(self, title, parent=None):
+		QAbstractItemModel.__init__(self, parent)
+		self.title = title
+		self.root = ComponentNode(title)
+		self.root.children = []
+
+
+	# The node shown by an index, None for rows that are shared catalog entries
+	def node(self, index):
+		if not index.isValid():
+			return self.root
+		child = index.internalPointer().children[index.row()]
+		if isinstance(child, ComponentNode):
+			return child
+		return None
+
+
+	# Index of a node
+	def nodeIndex(self, node):
+		if node is self.root:
+			return QModelIndex()
+		return self.createIndex(node.row, 0, node.parent)
+
+
+	# Names from the element down to the row of an index
+	def path(self, index):
+		names = []
+		while index.isValid():
+			names.insert(0, index.internalPointer().childName(index.row()))
+			index = index.parent()
+		return names
+
+
+	def index(self, row, column, parent=QModelIndex()):
+		node = self.node(parent)
+		if node is None or node.children is None or row < 0 or row >= len(node.children) or column != 0:
+			return QModelIndex()
+		return self.createIndex(row, column, node)
+
+
+	def parent(self, index):
+		if not index.isValid() or index.internalPointer() is self.root:
+			return QModelIndex()
+		return self.nodeIndex(index.internalPointer())
+
+
+	def rowCount(self, parent=QModelIndex()):
+		node = self.node(parent)
+		if node is None or node.children is None:
+			return 0
+		return len(node.children)
+
+
+	def columnCount(self, parent=QModelIndex()):
+		return 1
+
+
+	def data(self, index, role=Qt.DisplayRole):
+		if index.isValid() and role == Qt.DisplayRole:
+			return index.internalPointer().childName(index.row())
+		return None
+
+
+	def headerData(self, section, orientation, role=Qt.DisplayRole):
+		if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+			return self.title
+		return None
+
+
+# Available Components, backed by the element catalog. Components are only
+# created when their element is expanded and subcomponents when their
+# component is expanded. Components with the same slot interfaces share one
+# list of compatible subcomponents. When a search filter is set only the
+# matching rows (and the components that can hold matching subcomponents)
+# are shown and the matches are highlighted
+class AvailableModel(ComponentTreeModel):
+
+	def __init__(self, parent=None):
+		ComponentTreeModel.__init__(self, 'Available Components', parent)
+		self.catalog = sstSHELL.ElementCatalog()
+		self.subLists = {}
+		self.matches = None # (element, name) of the search matches, None shows everything
+		self.shown = None   # (element, name) of the components shown while searching
+
+
+	# Show a new catalog, only the element rows are created
+	def setCatalog(self, catalog):
+		self.catalog = catalog
+		self.setFilter(None)
+
+
+	# Only show the search matches, None shows the whole catalog
+	def setFilter(self, matches):
+		self.beginResetModel()
+		self.matches = matches
+		self.shown = None
+		self.subLists = {}
+		if matches is None:
+			# Only elements that have components are listed
+			elements = [element for element in self.catalog.elements if self.catalog.elements[element]['Component']]
+		else:
+			self.shown = set()
+			interfaces = set()
+			for key in matches:
+				entry = self.catalog.entries[key]
+				if entry['Kind'] == 'Component':
+					self.shown.add(key)
+				else:
+					interfaces.add(entry.get('Interface'))
+			# Components that can hold a matching subcomponent
+			for interface in interfaces:
+				self.shown.update((comp['Element'], comp['Name']) for comp in self.catalog.slots.get(interface, []))
+			elements = [element for element in self.catalog.elements if any((element, comp) in self.shown for comp in self.catalog.elements[element]['Component'])]
+		self.root.children = [ComponentNode(elements[row], self.root, row) for row in range(len(elements))]
+		self.endResetModel()
+
+
+	# Show a single message row, e.g. while the catalog is loading
+	def setMessage(self, text):
+		self.beginResetModel()
+		self.root.children = [ComponentNode(text, self.root)]
+		self.root.children[0].children = []
+		self.endResetModel()
+
+
+	# Children of an element or component row
+	def fetchChildren(self, node):
+		if node.entry is None:
+			components = self.catalog.components(node.name)
+			if self.shown is not None:
+				components = [comp for comp in components if (comp['Element'], comp['Name']) in self.shown]
+			return [ComponentNode(components[row]['Name'], node, row, components[row]) for row in range(len(components))]
+		interfaces = tuple(slot.get('Interface') for slot in node.entry['SubComponentSlot'])
+		# While searching, components that did not match only show the matching subcomponents
+		filtered = self.matches is not None and (node.entry['Element'], node.name) not in self.matches
+		if (interfaces, filtered) not in self.subLists:
+			subs = self.catalog.compatible(node.entry)
+			if filtered:
+				subs = [sub for sub in subs if (sub['Element'], sub['Name']) in self.matches]
+			self.subLists[(interfaces, filtered)] = subs
+		return self.subLists[(interfaces, filtered)]
+
+
+	def data(self, index, role=Qt.DisplayRole):
+		if index.isValid() and role == Qt.BackgroundRole and self.matches:
+			child = index.internalPointer().children[index.row()]
+			entry = child.entry if isinstance(child, ComponentNode) else child
+			if entry is not None and (entry['Element'], entry['Name']) in self.matches:
+				return QBrush(QColor('yellow'))
+		return ComponentTreeModel.data(self, index, role)
+
+
+	def hasChildren(self, parent=QModelIndex()):
+		node = self.node(parent)
+		if node is None:
+			return False
+		if node.children is not None:
+			return len(node.children) > 0
+		if node.entry is None:
+			return True
+		return any(slot.get('Interface') in self.catalog.interfaces for slot in node.entry['SubComponentSlot'])
+
+
+	def canFetchMore(self, parent):
+		node = self.node(parent)
+		return node is not None and node.children is None
+
+
+	def fetchMore(self, parent):
+		if not self.canFetchMore(parent):
+			return
+		node = self.node(parent)
+		children = self.fetchChildren(node)
+		if children:
+			self.beginInsertRows(parent, 0, len(children) - 1)
+			node.children = children
+			self.endInsertRows()
+		else:
+			node.children = children
+
+
+# Selected Components, element -> component -> subcomponent rows
+class SelectedModel(ComponentTreeModel):
+
+	def __init__(self, parent=None):
+		ComponentTreeModel.__init__(self, 'Selected Components', parent)
+
+
+	# Add a child row to a node and return its node
+	def addNode(self, node, name):
+		child = ComponentNode(name, node, len(node.children))
+		child.children = []
+		self.beginInsertRows(self.nodeIndex(node), child.row, child.row)
+		node.children.append(child)
+		self.endInsertRows()
+		return child
+
+
+	# Add a component, and optionally one subcomponent, under its element
+	def addComponent(self, element, component, subcomponent=None):
+		for node in self.root.children:
+			if node.name == element:
+				break
+		else:
+			node = self.addNode(self.root, element)
+		node = self.addNode(node, component)
+		if subcomponent:
+			self.addNode(node, subcomponent)
+
+
+	# Add a subcomponent to the component at index
+	def addSubcomponent(self, index, subcomponent):
+		self.addNode(self.node(index), subcomponent)
+
+
+	# Remove the rows at the indexes. If the last component of an element is
+	# removed, the whole element is removed
+	def removeIndexes(self, indexes):
+		nodes = [self.node(index) for index in indexes]
+		for node in nodes:
+			# Skip rows that went away with an already removed parent
+			attached = node
+			while attached is not self.root and attached.parent.children[attached.row:attached.row + 1] == [attached]:
+				attached = attached.parent
+			if attached is not self.root:
+				continue
+			if node.parent is not self.root and len(node.parent.children) == 1 and node.parent.parent is self.root:
+				node = node.parent
+			parent = node.parent
+			self.beginRemoveRows(self.nodeIndex(parent), node.row, node.row)
+			del parent.children[node.row]
+			for row in range(node.row, len(parent.children)):
+				parent.children[row].row = row
+			self.endRemoveRows()
+
+
+	# The selected components as ComponentSpecs for sstSHELL.connectModels
+	def specs(self):
+		components = []
+		for element in self.root.children:
+			for component in element.children:
+				components.append(sstSHELL.ComponentSpec(element.name, component.name, [sub.name for sub in component.children]))
+		return components
+
+##### Component Tree Models End
+####################################################################################
+
+
 ####################################################################################
 ##### Main Application Class
 class MyApp(QMainWindow, Ui_MainWindow):
@@ -41,13 +426,43 @@ class MyApp(QMainWindow, Ui_MainWindow):
 		self.toolsMenu.currentIndexChanged.connect(self.toolsSelect)
 		# General setup
 		self.updateMicrosec = 100000 #update gui every 0.1s
-		self.timer = datetime.now()
+		self.consoleLines = 20000 #lines kept in the information screen
+		self.sweepWarning = 1000 #ask before expanding larger sweeps
+		self.sweepRetries = 2 #times a failed sweep point is tried again on resume
+		self.compressLogs = False #gzip run logs when they are rotated
+		self.logLines = 1000 #lines shown by Search Logs
+		# Commands run in the background, Stop ends them
+		self.runs = 0
+		self.cancelled = False
+		self.processes = []
+		self.runners = []
+		self.eventLoops = 0
+		self.runButtons = [self.compile, self.run, self.run_con, self.runNetworkTest, self.toolsMenu,
+		                   self.generate, self.generate_sub, self.generate_con, self.generateNetwork]
+		self.stopRun.clicked.connect(self.cancelRuns)
+		self.jobs.setValue(sstSHELL.defaultJobs())
+		self.threads.valueChanged.connect(self.updateJobs)
+		self.sampling.currentIndexChanged.connect(self.updateSampling)
+		self.updateSampling()
+		# Output is buffered and written to the information screen in batches
+		self.info.document().setMaximumBlockCount(self.consoleLines)
+		self.infoBuffer = collections.deque(maxlen=self.consoleLines)
+		self.infoDropped = 0
+		self.infoFlushed = time.monotonic()
+		self.infoTimer = QTimer(self)
+		self.infoTimer.timeout.connect(self.flushInfo)
+		self.infoTimer.start(self.updateMicrosec // 1000)
 		self.modelDir.setText(str(os.getcwd()))
 		self.modelName.setFocus()
 		self.editor = os.getenv('EDITOR', 'gedit')
 		self.SSTinstalled = None
 		self.firstSeparator = True
-		self.updateTabs()
+		self.catalog = sstSHELL.ElementCatalog()
+		self.catalogLoader = CatalogLoader(self)
+		self.catalogLoader.loaded.connect(self.catalogLoaded)
+		self.catalogLoader.failed.connect(self.catalogFailed)
+		self.catalogError = False
+		self.catalogLoader.finished.connect(self.catalogFinished)
 		self.tabWidget.currentChanged.connect(self.updateTabs)
 		# Model Creator Tab
 		self.templates.itemDoubleClicked.connect(self.templateHelp)
@@ -63,11 +478,16 @@ class MyApp(QMainWindow, Ui_MainWindow):
 		self.newComp.clicked.connect(self.addModel)
 		self.addSub.clicked.connect(self.addSubcomponent)
 		self.remove.clicked.connect(self.removeModel)
+		self.availableModel = AvailableModel(self)
+		self.available.setModel(self.availableModel)
 		self.available.setSelectionMode(QAbstractItemView.ExtendedSelection)
-		self.available.itemDoubleClicked.connect(self.availableHelp)
+		self.available.doubleClicked.connect(self.availableHelp)
 		self.available.setExpandsOnDoubleClick(False)
+		self.search.textChanged.connect(self.searchComponents)
+		self.selectedModel = SelectedModel(self)
+		self.selected.setModel(self.selectedModel)
 		self.selected.setSelectionMode(QAbstractItemView.ExtendedSelection)
-		self.selected.itemDoubleClicked.connect(self.selectedHelp)
+		self.selected.doubleClicked.connect(self.selectedHelp)
 		self.selected.setExpandsOnDoubleClick(False)
 		self.generate_con.clicked.connect(self.generateCon)
 		self.run_con.clicked.connect(self.runCon)
@@ -92,6 +512,8 @@ class MyApp(QMainWindow, Ui_MainWindow):
 		self.badParams = ['id', 'network_inspectors', 'fattree:adaptive_threshold', 'num_peers', 'num_vns', 'num_ports']
 		self.bold = QFont()
 		self.bold.setBold(True)
+		# Fill the tabs, the element catalog is loaded in the background
+		self.updateTabs()
 	############################################################################
 
 
@@ -150,14 +572,22 @@ class MyApp(QMainWindow, Ui_MainWindow):
 		if not self.getModel(): return
 		self.writeSeparator()
 		self.writeInfo('***** Building Model *****\n\n')
-		if self.clean.isChecked():
-			self.runCmdByLine('make clean -C ' + self.modelPath + '/' + self.model)
-		# runCmdByLine returns the make return value (0 success, others fail)
-		failed = self.runCmdByLine('make all -C ' + self.modelPath + '/' + self.model)
+		self.beginRun()
+		try:
+			if self.clean.isChecked():
+				self.runCmdByLine('make clean -C ' + self.modelPath + '/' + self.model)
+			# runCmdByLine returns the make return value (0 success, others fail)
+			failed = self.cancelled or self.runCmdByLine('make all -C ' + self.modelPath + '/' + self.model)
+		finally:
+			self.endRun()
+		if self.cancelled:
+			return
 		if failed:
 			self.writeInfo('\n*** ERROR DURING MAKE!!! PLEASE FIX THE ERROR BEFORE CONTINUING ***', 'red')
 			return
 		self.writeInfo('\nModel has compiled successfully\n')
+		# Pick up the newly registered library without rebuilding the whole catalog
+		self.updateCatalog([self.model])
 		if self.autoRun.isChecked():
 			self.runModel()
 
@@ -225,60 +655,36 @@ class MyApp(QMainWindow, Ui_MainWindow):
 
 	# Update the Available Models
 	def updateModels(self):
-		self.available.clear()
-		self.elements = []
-		subs = self.sstinfo.findall('*/SubComponent')
-		for element in self.sstinfo.findall('Element'):
-			components = element.findall('Component')
-			self.elements.append(element.get('Name'))
-			if components:
-				# Create an element item in the TreeWidget for elements that have components
-				e = QTreeWidgetItem(self.available)
-				e.setText(0, element.get('Name'))
-				for component in components:
-					# Create component items in the element item
-					c = QTreeWidgetItem(e)
-					c.setText(0, component.get('Name'))
-					subcomponents = component.findall('SubComponentSlot')
-					if subcomponents:
-						for subcomponent in subcomponents:
-							# Create subcomponent items in the component item that have the correct interface
-							for sub in subs:
-								if subcomponent.get('Interface') == sub.get('Interface'):
-									s = QTreeWidgetItem(c)
-									s.setText(0, sub.get('Name'))
+		self.elements = list(self.catalog.elements)
+		if self.availableModel.catalog is not self.catalog:
+			self.availableModel.setCatalog(self.catalog)
+			self.searchComponents()
+
+
+	# Filter the Available Components to the search matches
+	def searchComponents(self):
+		text = self.search.text().strip()
+		if text:
+			self.availableModel.setFilter(self.catalog.searchIndex().find(text))
+			# Open up the elements when the matches fit on screen
+			if self.availableModel.rowCount() <= 20:
+				self.available.expandToDepth(0)
+		else:
+			self.availableModel.setFilter(None)
+
+
+	# Paths (element, component, subcomponent) of the selected rows of a tree
+	def selectedPaths(self, tree):
+		return [tree.model().path(index) for index in tree.selectionModel().selectedIndexes()]
 
 
 	# Add Models
 	def addModel(self):
-		root = self.selected.invisibleRootItem()
-		for item in self.available.selectedItems():
+		for path in self.selectedPaths(self.available):
 			# Make sure the item has a element (it is a component, not an element itself)
-			if item.parent():
-				# Subcomponent if it has 2 parents
-				if item.parent().parent():
-					c = item.parent()
-					e = item.parent().parent()
-				else:
-					c = item
-					e = item.parent()
-				elementExists = False
-				# Loop through the elements to see if we have a element that matches already
-				for i in range(root.childCount()):
-					element = root.child(i)
-					if e.text(0) == element.text(0):
-						elementExists = True
-				# No element exists in the selected tree, create one
-				if not elementExists:
-					element = QTreeWidgetItem(self.selected)
-					element.setText(0, e.text(0))
-				# Connect the component to the proper element
-				component = QTreeWidgetItem(element)
-				component.setText(0, c.text(0))
-				if item.parent().parent():
-					# Connect the subcomponent to the component
-					subcomponent = QTreeWidgetItem(component)
-					subcomponent.setText(0, item.text(0))
+			if len(path) > 1:
+				# Connect the component, and the subcomponent if one was selected, to the proper element
+				self.selectedModel.addComponent(*path)
 			else:
 				self.writeInfo('*** Need to select a COMPONENT or SUBCOMPONENT from the Available Components ***\n\n', 'red')
 		self.selected.expandToDepth(1)
@@ -286,32 +692,22 @@ class MyApp(QMainWindow, Ui_MainWindow):
 
 	# Add subcomponent to existing component
 	def addSubcomponent(self):
-		root = self.selected.invisibleRootItem()
-		for item in self.available.selectedItems():
-			if self.selected.currentItem():
+		current = self.selected.currentIndex()
+		for path in self.selectedPaths(self.available):
+			if current.isValid():
 				# Make sure the item is a subcomponent
-				if item.parent():
-					if item.parent().parent():
-						# Selected item needs to be a component
-						if self.selected.currentItem().parent():
-							if not self.selected.currentItem().parent().parent():
-								subcomponent = self.sstinfo.find("*/SubComponent[@Name='" + item.text(0) + "']")
-								slots = self.sstinfo.find("*/Component[@Name='" + self.selected.currentItem().text(0) + "']").findall('SubComponentSlot')
-								fits = False
-								for slot in slots:
-									if subcomponent.get('Interface') == slot.get('Interface'):
-										# Connect the subcomponent to the component
-										subcomponent = QTreeWidgetItem(self.selected.currentItem())
-										subcomponent.setText(0, item.text(0))
-										fits = True
-								if not fits:
-									self.writeInfo('*** Subcomponent does not fit in the selected component slot ***\n\n', 'red')
-							else:
-								self.writeInfo('*** Need to select a COMPONENT from the Selected Components ***\n\n', 'red')
+				if len(path) == 3:
+					# Selected item needs to be a component
+					component = self.selectedModel.path(current)
+					if len(component) == 2:
+						subcomponent = self.catalog.find(path[2], path[0], 'SubComponent')
+						if self.catalog.slotsFor(self.catalog.find(component[1], component[0], 'Component'), subcomponent):
+							# Connect the subcomponent to the component
+							self.selectedModel.addSubcomponent(current, path[2])
 						else:
-							self.writeInfo('*** Need to select a COMPONENT from the Selected Components ***\n\n', 'red')
+							self.writeInfo('*** Subcomponent does not fit in the selected component slot ***\n\n', 'red')
 					else:
-						self.writeInfo('*** Need to select a SUBCOMPONENT from the Available Components ***\n\n', 'red')
+						self.writeInfo('*** Need to select a COMPONENT from the Selected Components ***\n\n', 'red')
 				else:
 					self.writeInfo('*** Need to select a SUBCOMPONENT from the Available Components ***\n\n', 'red')
 			else:
@@ -321,16 +717,7 @@ class MyApp(QMainWindow, Ui_MainWindow):
 
 	# Remove Models
 	def removeModel(self):
-		root = self.selected.invisibleRootItem()
-		for item in self.selected.selectedItems():
-			if item.parent():
-				# If removing the last component, remove the whole element
-				if item.parent().childCount() == 1:
-					root.removeChild(item.parent())
-				else:
-					item.parent().removeChild(item)
-			else:
-				root.removeChild(item)
+		self.selectedModel.removeIndexes(self.selected.selectionModel().selectedIndexes())
 
 
 	# Creates or opens python file
@@ -341,29 +728,13 @@ class MyApp(QMainWindow, Ui_MainWindow):
 		if makefiles == None:
 			return
 		if makefiles:
-			if self.selected.invisibleRootItem().childCount() == 0:
+			# build up the list of components with their subcomponents
+			components = self.selectedModel.specs()
+			if not components:
 				self.writeInfo('*** NO COMPONENTS SELECTED ***\n\n', 'red')
 				return
 			os.system('rm -rf ' + self.model)
-			components = ''
-			root = self.selected.invisibleRootItem()
-			# build up the list with format element.component.subcomponent,subcomponent;
-			for i in range(root.childCount()):
-				element = root.child(i)
-				for j in range(element.childCount()):
-					component = element.child(j)
-					components += element.text(0) + '.' + component.text(0)
-					if component.childCount() != 0:
-						components += '.'
-						for k in range(component.childCount()):
-							components += component.child(k).text(0)
-							if k == component.childCount() - 1:
-								components += ';'
-							else:
-								components += ','
-					else:
-						components += ';'
-			sstSHELL.connectModels(self.model, components, self.modelPath)
+			sstSHELL.connectModels(self.model, components, self.modelPath, self.catalog)
 		f = self.modelPath + '/' + self.model + '/' + self.model + '.py'
 		self.createdFilesMessage([f])
 		os.system(self.editor + ' ' + f + ' &')
@@ -389,6 +760,17 @@ class MyApp(QMainWindow, Ui_MainWindow):
 	def updateTopologies(self):
 		self.listTopologies.clear()
 		self.listEndpoints.clear()
+		for subCompTopology in self.catalog.interfaces.get('SST::Merlin::Topology', []):
+			self.listTopologies.addItem(subCompTopology['Name'])
+			# Topologies may come from any element, the item keeps which
+			self.listTopologies.item(self.listTopologies.count()-1).setData(Qt.UserRole, subCompTopology['Element'])
+		for ep in self.catalog.components('merlin'):
+			if ep['Name'].endswith('_endpoint'):
+				self.listEndpoints.addItem(ep['Name'][:-9])
+
+
+	# Checks Overwrite Existing Models when the Network Gen tab is selected
+	def updateOverwrite(self):
 		# Make sure that Overwrite Existing Models is checked by default on this
 		# tab. Get the page, then set index to the index of the networkGen page.
 		# Check if the current tab is equal to the index of networkGen
@@ -399,12 +781,6 @@ class MyApp(QMainWindow, Ui_MainWindow):
 				self.overwrite.setChecked(True)
 		else:
 			self.overwrite.setChecked(False)
-		for subCompTopology in self.sstinfo.findall('*/SubComponent'):
-			if subCompTopology.get('Interface') == "SST::Merlin::Topology":
-				self.listTopologies.addItem(subCompTopology.get('Name'))
-		for ep in self.sstinfo.findall('Element[@Name="merlin"]/Component'):
-			if ep.get('Name').endswith('_endpoint'):
-				self.listEndpoints.addItem(ep.get('Name')[:-9])
 
 
 	# Displays the available parameters of the selected topology
@@ -518,6 +894,8 @@ class MyApp(QMainWindow, Ui_MainWindow):
 			self.paramSweep()
 		elif t == 3:
 			self.model2Template()
+		elif t == 4:
+			self.searchLogs()
 
 
 	# Graph a model
@@ -527,7 +905,22 @@ class MyApp(QMainWindow, Ui_MainWindow):
 		if not path:
 			self.writeInfo('*** PLEASE SELECT A PYTHON TEST FILE ***\n\n', 'red')
 			return
-		files = sstSHELL.graphModel(path)
+		commands, env, files = sstSHELL.graphCommands(path)
+		self.writeSeparator()
+		self.writeInfo('***** Graphing ' + os.path.basename(path) + ' *****\n\n')
+		self.beginRun()
+		try:
+			for command in commands:
+				if self.cancelled:
+					return
+				try:
+					self.runCmdByLine(command, env=env)
+				except OSError as error:
+					self.writeInfo(str(error) + '\n', 'red')
+					continue
+				sstSHELL.graphRename(command)
+		finally:
+			self.endRun()
 		self.createdFilesMessage(files.split(' '))
 		for f in files.split(' '):
 			if not f.endswith('.2.svg') and not f.endswith('.dot'):
@@ -540,13 +933,20 @@ class MyApp(QMainWindow, Ui_MainWindow):
 		if not path:
 			self.writeInfo('*** PLEASE SELECT A PYTHON TEST FILE ***\n\n', 'red')
 			return
+		sampling = self.sweepSampling()
+		try:
+			size = sstSHELL.sweepSize(sstSHELL.findSweeps(path), sampling)
+		except ValueError as error:
+			self.writeInfo('*** ' + str(error) + ' ***\n\n', 'red')
+			return
+		if size > self.sweepWarning:
+			text = 'The sweep expands into ' + str(size) + ' test files, are you sure you want to continue?'
+			if self.warningPopup(text, 'Large Sweep') == QMessageBox.No:
+				return
 		self.writeSeparator()
-		self.writeInfo('Expanding Parameters\n')
-		subdir = sstSHELL.paramSweep(path)
-		if subdir.startswith('ERROR'):
-			self.writeInfo(subdir, 'red')
-		else:
-			self.writeInfo('Parameters expanded successfully into ' + subdir + '\n')
+		self.writeInfo('Expanding Parameters into ' + str(size) + ' test files\n')
+		subdir = sstSHELL.paramSweep(path, sampling)
+		self.writeInfo('Parameters expanded successfully into ' + subdir + '\n')
 
 
 	# Convert a model into a template
@@ -571,6 +971,41 @@ class MyApp(QMainWindow, Ui_MainWindow):
 		self.updateTemplates()
 		os.system(self.editor + ' ' + f + '&')
 
+
+	# Searches a run log for a regular expression, the log is searched on disk
+	# so logs too big for the information screen can be searched. Without a
+	# pattern the end of the log is shown
+	def searchLogs(self):
+		path = QFileDialog.getOpenFileName(self, 'Select Log File', sstSHELL.cacheDir + '/logs', 'Log files (*.log *.log.* *.gz);;All files (*)')[0]
+		if not path:
+			self.writeInfo('*** PLEASE SELECT A LOG FILE ***\n\n', 'red')
+			return
+		pattern, ok = QInputDialog.getText(self, 'Search ' + os.path.basename(path), 'Regular expression (empty shows the end of the log)', QLineEdit.Normal)
+		if not ok:
+			return
+		self.writeSeparator()
+		if not pattern:
+			if path.endswith('.gz'):
+				self.writeInfo('*** COMPRESSED LOGS CAN ONLY BE SEARCHED ***\n\n', 'red')
+				return
+			first, lines = sstSHELL.logLines(path, count=self.logLines)
+			self.writeInfo('***** Last lines of ' + path + ' *****\n\n')
+			for number, line in enumerate(lines, first):
+				self.writeInfo(str(number) + ': ' + line)
+			return
+		try:
+			matches, more = sstSHELL.searchLog(path, pattern, self.logLines)
+		except re.error as error:
+			self.writeInfo('*** BAD REGULAR EXPRESSION: ' + str(error) + ' ***\n\n', 'red')
+			return
+		self.writeInfo('***** Searching ' + path + ' for ' + pattern + ' *****\n\n')
+		for number, line in matches:
+			self.writeInfo(str(number) + ': ' + line)
+		if more:
+			self.writeInfo('\nOnly the first ' + str(len(matches)) + ' matching lines are shown\n', 'blue')
+		else:
+			self.writeInfo('\n' + str(len(matches)) + ' matching lines\n', 'blue')
+
 	### End Menu Functions
 	############################################################################
 
@@ -667,34 +1102,312 @@ class MyApp(QMainWindow, Ui_MainWindow):
 
 	# loops through all the tests and runs them
 	def runTests(self, testfiles):
-		for testfile in testfiles:
-			self.writeInfo('*** ' + os.path.basename(testfile) + ' ***\n')
-			sweep = False
-			# Search the test to see if any parameter sweeping is done
-			with open(testfile, 'r') as infile:
-				found = False
-				for line in infile:
-					if not line.lstrip().startswith('#'): # Skip comments
-						if '.addParams' in line:
-							found = True
-						if found:
-							newline = line.strip().split(':')
-							if len(newline) >= 2:
-								value = newline[1].split('"')[1]
-								if ';' in value or ',' in value:
-									sweep = True
-			if sweep:
-				# Create all the tests from the sweep and then run them all
-				subdir = sstSHELL.paramSweep(testfile)
-				if subdir.startswith('ERROR'):
-					self.writeInfo(subdir, 'red')
+		self.beginRun()
+		try:
+			for number, testfile in enumerate(testfiles):
+				if self.cancelled:
+					self.writeInfo('Stopped, ' + str(len(testfiles) - number) + ' tests were not run\n', 'red')
+					break
+				self.writeInfo('*** ' + os.path.basename(testfile) + ' ***\n')
+				# Search the test to see if any parameter sweeping is done, the parse
+				# is kept for the sweep expansion
+				try:
+					sweep = len(sstSHELL.findSweeps(testfile)) > 0
+				except ValueError as error:
+					self.writeInfo(str(error) + ', the test was not run\n\n', 'red')
+					continue
+				if sweep and self.sampling.currentText() == 'Adaptive':
+					self.runAdaptiveSweep(testfile)
+				elif sweep and self.virtualSweep.isChecked():
+					# Run every point of the sweep through a single driver config
+					driver, manifest, size = sstSHELL.virtualSweep(testfile, self.sweepSampling())
+					path = os.path.dirname(driver)
+					commands = [sstSHELL.sweepCommand(driver, i, self.sstCommand()) for i in range(size)]
+					names = ['point_' + str(i) for i in range(size)]
+					self.writeInfo('Sweep points are listed in ' + manifest + '\n')
+					# The driver reads the values of its point from the manifest
+					with open(driver, 'r') as fp:
+						text = fp.read()
+					configs = [text + repr(values) for values in sstSHELL.manifestParams(manifest)[1]]
+					self.runSweep(testfile, commands, names, path + '/logs', manifest, path + '/results.csv', configs)
+				elif sweep:
+					# Create all the tests from the sweep and then run them all
+					subdir = sstSHELL.paramSweep(testfile, self.sweepSampling())
+					commands, names, configs = self.expandedRuns(subdir)
+					self.runSweep(testfile, commands, names, subdir + '/logs', subdir + '/manifest.csv', subdir + '/results.csv', configs)
 				else:
-					sweepfiles = sorted(glob.glob(subdir + '/*.py'))
-					for sweep in sweepfiles:
-						self.writeInfo('\n** ' + os.path.basename(sweep) + ' **\n')
-						self.runCmdByLine('sst ' + sweep)
-			else:
-				self.runCmdByLine('sst ' + testfile)
+					self.runTest(testfile)
+		finally:
+			self.endRun()
+
+
+	# Commands, run names and config texts of an expanded sweep, the manifest
+	# lists the test files in run number order
+	def expandedRuns(self, subdir):
+		sweepfiles = sstSHELL.readTable(subdir + '/manifest.csv', numeric=False)['file']
+		commands = [self.sstCommand() + subdir + '/' + sweep for sweep in sweepfiles]
+		names = [sweep.replace('.py', '') for sweep in sweepfiles]
+		configs = []
+		for sweep in sweepfiles:
+			with open(subdir + '/' + sweep, 'r') as fp:
+				configs.append(fp.read())
+		return commands, names, configs
+
+
+	# Runs a sweep in rounds, refining only where the metric still changes by
+	# more than the tolerance, see sstSHELL.AdaptiveSweep. Every round runs the
+	# new points as part of one growing sweep, so an adaptive sweep resumes
+	# like any other
+	def runAdaptiveSweep(self, testfile):
+		metric = self.metric.text().strip()
+		if not metric:
+			self.writeInfo('*** PLEASE ENTER THE METRIC OF THE ADAPTIVE SWEEP ***\n\n', 'red')
+			return
+		template = sstSHELL.SweepTemplate(testfile)
+		adaptive = sstSHELL.AdaptiveSweep(template.sweeps, self.tolerance.value(), self.budget.value(), template.ranges)
+		with open(testfile, 'r') as fp:
+			key = sstSHELL.sweepKey(['adaptive', metric, str(adaptive.tolerance), str(adaptive.budget)], [fp.read()])
+		batch = adaptive.next()
+		rounds = 0
+		while batch:
+			rounds += 1
+			self.writeInfo('Adaptive round ' + str(rounds) + ', ' + str(len(batch)) + ' new sweep points\n', 'blue')
+			subdir = sstSHELL.paramSweep(testfile, points=adaptive.points)
+			commands, names, configs = self.expandedRuns(subdir)
+			statuses = self.runSweep(testfile, commands, names, subdir + '/logs', subdir + '/manifest.csv', subdir + '/results.csv', configs, key)
+			if statuses is None:
+				return
+			for run, point in enumerate(adaptive.points):
+				value = None
+				if statuses.get(run) == 0:
+					value = sstSHELL.metricValue(subdir + '/logs/' + names[run] + '.log', metric)
+				adaptive.update(point, value)
+			if not any(value is not None for value in adaptive.metrics.values()):
+				self.writeInfo('No run reported ' + metric + ', nothing to refine\n', 'red')
+				break
+			adaptive.refine()
+			batch = adaptive.next()
+		self.writeInfo('Adaptive sweep ran ' + str(len(adaptive.points)) + ' points in ' + str(rounds) + ' rounds, '
+		               + str(adaptive.pruned()) + ' points of the full sweep were pruned\n', 'green')
+
+
+	# Runs a single test, replaying its output if the result cache has it
+	def runTest(self, testfile):
+		log = os.path.dirname(testfile) + '/logs/' + os.path.basename(testfile).replace('.py', '.log')
+		if not self.reuseResults.isChecked():
+			self.runCmdByLine(self.sstCommand() + testfile, log=log, timeout=self.runTimeout())
+			return
+		cache = sstSHELL.ResultCache()
+		with open(testfile, 'r') as fp:
+			key = cache.key(fp.read(), self.sstCommand())
+		meta = cache.get(key, log)
+		if meta is not None:
+			self.writeInfo('Unchanged since the last run, replaying its output\n', 'blue')
+			# Only the end of the log is read, half of what the information
+			# screen keeps so the output before it stays in view
+			first, lines = sstSHELL.logLines(log, count=self.consoleLines // 2)
+			if first > 1:
+				self.writeInfo('... ' + str(first - 1) + ' lines not shown, the whole output is in ' + log + ' ...\n', 'gray')
+			for line in lines:
+				self.writeInfo(line)
+			return
+		start = time.monotonic()
+		status = self.runCmdByLine(self.sstCommand() + testfile, log=log, timeout=self.runTimeout())
+		# A log that was rotated no longer holds the whole output, so it is not kept
+		if status == 0 and not glob.glob(log + '.1*'):
+			cache.put(key, log, {'exit': status, 'wall_s': round(time.monotonic() - start, 3), 'max_rss_kb': ''})
+
+
+	# Runs the sweep points in parallel, each with its own log file, and
+	# collects the results table of the sweep from the logs when done. Points
+	# whose config text (configs) ran before are replayed from the result cache
+	# The state of every point goes to journal.jsonl next to the logs, running
+	# the same sweep again resumes it: finished points are skipped and failed
+	# points are tried again up to sweepRetries times
+	# The journal identifies the sweep by its commands and configs unless key is
+	# given. The points expected to take longest, from the runtime history of
+	# testfile, are started first. Returns the exit status of every point, None
+	# if the sweep stopped
+	def runSweep(self, testfile, commands, names, logdir, manifest, results, configs, key=None):
+		logs = [logdir + '/' + name + '.log' for name in names]
+		jobs = self.jobs.value()
+		statuses = {}
+		usage = {}
+		paramNames, params = sstSHELL.manifestParams(manifest)
+		journal = sstSHELL.RunJournal(os.path.dirname(logdir) + '/journal.jsonl', key or sstSHELL.sweepKey(commands, configs))
+		for index in journal.finished(self.sweepRetries):
+			record = journal.states[index]
+			statuses[index] = record['exit']
+			usage[index] = (record.get('wall_s', ''), record.get('max_rss_kb', ''))
+		if statuses:
+			self.writeInfo(str(len(statuses)) + ' of ' + str(len(commands)) + ' sweep points already finished, resuming after them\n', 'blue')
+		pending = [index for index in range(len(commands)) if index not in statuses]
+		cache = None
+		if self.reuseResults.isChecked():
+			cache = sstSHELL.ResultCache()
+			keys = {index: cache.key(configs[index], self.sstCommand()) for index in pending}
+			reused = 0
+			for index in pending:
+				meta = cache.get(keys[index], logs[index])
+				if meta is not None:
+					statuses[index] = meta['exit']
+					usage[index] = (meta['wall_s'], meta['max_rss_kb'])
+					journal.record(index, 'done', statuses[index], usage[index])
+					reused += 1
+			if reused:
+				self.writeInfo(str(reused) + ' sweep points are unchanged since they last ran, reusing their results\n', 'blue')
+			pending = [index for index in pending if index not in statuses]
+		if self.validateSweeps.isChecked() and pending:
+			invalid = self.validateSweep(commands, names, logdir, pending)
+			if invalid is None:
+				journal.close()
+				if not self.cancelled:
+					self.writeInfo('Sweep stopped, fix the failing points and run it again\n', 'red')
+				return None
+			for index in sorted(invalid):
+				# The log of an invalid point is its init output
+				shutil.copyfile(logdir + '/init/' + names[index] + '.log', logs[index])
+				statuses[index] = invalid[index]
+				usage[index] = ('', '')
+				journal.record(index, 'failed', statuses[index], usage[index])
+			pending = [index for index in pending if index not in invalid]
+		done = len(statuses)
+		history = sstSHELL.RuntimeHistory(testfile, self.sstCommand())
+		predictor = sstSHELL.RuntimePredictor(paramNames, history.runs)
+		predictions = {index: predictor.predict(dict(zip(paramNames, params[index]))) for index in pending}
+		if pending and predictions[pending[0]] is not None:
+			# Longest expected first so no long run is left going alone at the end
+			pending.sort(key=lambda index: -predictions[index])
+			expected = sstSHELL.remainingTime([predictions[index] for index in pending], jobs)
+			self.writeInfo('Longest expected sweep points go first, about ' + sstSHELL.formatDuration(expected) + ' expected\n', 'blue')
+		journal.recordAll(pending, 'queued')
+		self.writeInfo('Running ' + str(len(pending)) + ' sweep points, ' + str(jobs) + ' at a time. Logs are in ' + logdir + '\n')
+		startTimes = {}
+		finished = []
+		def started(index):
+			startTimes[pending[index]] = time.monotonic()
+			journal.record(pending[index], 'running')
+		def runFinished(index, status, runUsage):
+			nonlocal done
+			index = pending[index]
+			usage[index] = runUsage
+			statuses[index] = status
+			if status == 0:
+				finished.append((dict(zip(paramNames, params[index])), usage[index][0]))
+			journal.record(index, 'failed' if status else 'done', status, usage[index])
+			if cache is not None and status == 0:
+				cache.put(keys[index], logs[index], {'exit': status, 'wall_s': usage[index][0], 'max_rss_kb': usage[index][1]})
+			done += 1
+			running = min(jobs, len(commands) - done)
+			text = '[' + str(done) + '/' + str(len(commands)) + '] ' + names[index]
+			text += ' exited with ' + str(status) + ', ' + str(running) + ' running'
+			left = self.sweepTimeLeft(pending, statuses, predictions, startTimes, finished)
+			if left is not None and running:
+				text += ', about ' + sstSHELL.formatDuration(sstSHELL.remainingTime(left, jobs)) + ' left'
+			if status == sstSHELL.timeoutStatus:
+				text += ' (timed out)'
+			self.writeInfo(text + '\n', 'red' if status else 'black')
+		ran = self.runParallel([commands[i] for i in pending], [logs[i] for i in pending], jobs, runFinished, started)
+		journal.close()
+		history.record(finished)
+		if self.cancelled or not ran:
+			self.writeInfo('Sweep stopped after ' + str(done) + ' of ' + str(len(commands)) + ' points, run it again to resume\n', 'red')
+			return None
+		failed = [logs[index] for index in sorted(statuses) if statuses[index]]
+		self.writeInfo('\n' + str(done - len(failed)) + ' sweep points passed, ' + str(len(failed)) + ' failed\n', 'red' if failed else 'green')
+		for log in failed:
+			self.writeInfo('\t- ' + log + '\n', 'red')
+		columns, rows = sstSHELL.sweepResults(paramNames, params, statuses, usage, logs)
+		sstSHELL.writeTable(results, columns, rows)
+		self.writeInfo('Results table written to ' + results + '\n')
+		return statuses
+
+
+	# Seconds each unfinished sweep point still needs, from its predicted wall
+	# time, or the mean of the points finished so far without a prediction.
+	# Running points are credited with the time they have run. None if there
+	# is nothing to go by yet
+	def sweepTimeLeft(self, pending, statuses, predictions, startTimes, finished):
+		mean = sum(wall for params, wall in finished) / len(finished) if finished else None
+		now = time.monotonic()
+		left = []
+		for index in pending:
+			if index in statuses:
+				continue
+			expected = predictions[index] if predictions[index] is not None else mean
+			if expected is None:
+				return None
+			left.append(max(0, expected - (now - startTimes[index])) if index in startTimes else expected)
+		return left
+
+
+	# Runs the points of a sweep in sst's init mode, which builds the model
+	# without simulating it, so a bad value is reported before any simulation
+	# starts. Returns the exit status of every invalid point, or None if the
+	# sweep should stop
+	def validateSweep(self, commands, names, logdir, pending):
+		self.writeInfo('Validating ' + str(len(pending)) + ' sweep points with sst --run-mode=init\n')
+		initLogs = [logdir + '/init/' + names[index] + '.log' for index in pending]
+		initCommands = [sstSHELL.initCommand(commands[index]) for index in pending]
+		failed = {}
+		def runFinished(index, status, usage):
+			if status:
+				failed[pending[index]] = status
+		if not self.runParallel(initCommands, initLogs, self.jobs.value(), runFinished) or self.cancelled:
+			return None
+		valid = len(pending) - len(failed)
+		if not failed:
+			self.writeInfo('All sweep points are valid\n', 'green')
+			return failed
+		self.writeInfo(str(len(failed)) + ' of ' + str(len(pending)) + ' sweep points failed validation:\n', 'red')
+		for index in sorted(failed):
+			self.writeInfo('\t- ' + names[index] + ': ' + sstSHELL.lastLine(logdir + '/init/' + names[index] + '.log') + '\n', 'red')
+		if not valid:
+			return None
+		text = str(len(failed)) + ' sweep points failed validation, do you want to run the other ' + str(valid) + '?'
+		if self.warningPopup(text, 'Invalid Sweep Points') == QMessageBox.No:
+			return None
+		return failed
+
+
+	# How the points of a sweep are picked, None runs every combination
+	def sweepSampling(self):
+		# Adaptive sweeps pick their points as they run, see runAdaptiveSweep
+		if self.sampling.currentIndex() == 0 or self.sampling.currentText() == 'Adaptive':
+			return None
+		method = sstSHELL.samplingMethods[self.sampling.currentIndex()]
+		return sstSHELL.Sampling(method, self.budget.value(), self.seed.value())
+
+
+	# Only show the sweep options the selected sampling uses
+	def updateSampling(self):
+		adaptive = self.sampling.currentText() == 'Adaptive'
+		sampled = self.sampling.currentIndex() != 0 and not adaptive
+		self.metric.setVisible(adaptive)
+		self.tolerance.setVisible(adaptive)
+		self.label_11.setVisible(adaptive or sampled)
+		self.budget.setVisible(adaptive or sampled)
+		self.label_12.setVisible(sampled)
+		self.seed.setVisible(sampled)
+
+
+	# The sst command line with the number of threads per run
+	def sstCommand(self):
+		if self.threads.value() > 1:
+			return 'sst -n ' + str(self.threads.value()) + ' '
+		return 'sst '
+
+
+	# Seconds a single run may take, None if there is no timeout
+	def runTimeout(self):
+		if self.timeout.value():
+			return self.timeout.value() * 60
+		return None
+
+
+	# Default the parallel runs to the cores divided by the threads per run
+	def updateJobs(self):
+		self.jobs.setValue(sstSHELL.defaultJobs(self.threads.value()))
 
 
 	# Write a horizontal separator to information screen
@@ -702,6 +1415,7 @@ class MyApp(QMainWindow, Ui_MainWindow):
 		if self.firstSeparator:
 			self.firstSeparator = False
 		else:
+			self.flushInfo()
 			self.info.moveCursor(QTextCursor.End)
 			self.info.insertHtml('<hr><br>')
 			self.info.moveCursor(QTextCursor.End)
@@ -712,42 +1426,223 @@ class MyApp(QMainWindow, Ui_MainWindow):
 	# black(default), gray, silver, white
 	# red, yellow, green, blue, purple
 	# maroon, olive, lime, aqua, teal, navy, fuchsia
+	# The text is buffered and written by flushInfo on a timer, a task that keeps
+	# writing without returning to the event loop flushes every updateMicrosec
 	def writeInfo(self, text, color='black'):
-		colorText = '<span style="white-space:pre-wrap; color:' + color + ';">'
-		colorText += html.escape(text) + '</span>'
-		self.info.moveCursor(QTextCursor.End)
-		self.info.insertHtml(colorText)
+		if len(self.infoBuffer) == self.infoBuffer.maxlen:
+			self.infoDropped += 1
+		self.infoBuffer.append((text, color))
+		if (time.monotonic() - self.infoFlushed) * 1000000 > self.updateMicrosec:
+			self.flushInfo()
+			# While a command runs its event loop keeps the GUI going, processing
+			# events here would handle its next output before this is written
+			if not self.eventLoops:
+				app.processEvents()
+
+
+	# Writes the buffered text to the information screen with one insertHtml,
+	# consecutive text of one color shares a span. The screen keeps the last
+	# consoleLines lines, text that fell out of a full buffer is noted
+	def flushInfo(self):
+		self.infoFlushed = time.monotonic()
+		if not self.infoBuffer:
+			return
+		spans = [] # [color, [text, ...]]
+		if self.infoDropped:
+			spans.append(['gray', ['... ' + str(self.infoDropped) + ' lines not shown ...\n']])
+			self.infoDropped = 0
+		while self.infoBuffer:
+			text, color = self.infoBuffer.popleft()
+			if spans and spans[-1][0] == color:
+				spans[-1][1].append(text)
+			else:
+				spans.append([color, [text]])
+		colorText = ''.join('<span style="white-space:pre-wrap; color:' + color + ';">' + html.escape(''.join(text)) + '</span>' for color, text in spans)
+		cursor = QTextCursor(self.info.document())
+		cursor.movePosition(QTextCursor.End)
+		cursor.insertHtml(colorText)
 		self.info.moveCursor(QTextCursor.End)
-		time = datetime.now()
-		delta = time - self.timer
-		if delta.microseconds > self.updateMicrosec:
-			self.timer = time
-			app.processEvents()
 
 
 	# Runs a command and prints the output line by line while the command is running
-	# Returns the exit status of the command
-	def runCmdByLine(self, command, color='black'):
-		process = subprocess.Popen(command.split(), stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-		output = process.stdout.readline()
-		while output != b'' or process.poll() is None:
-			self.writeInfo(output.decode('utf-8'), color)
-			output = process.stdout.readline()
-		return process.poll()
-
-
-	# Update all tabs
+	# Returns the exit status of the command. The output is also written to the
+	# log file log, or to a log of its own in sstSHELL.runLogPath, as it arrives,
+	# see sstSHELL.RunLog
+	# The GUI keeps running meanwhile and Stop ends the command. A command still
+	# running after timeout seconds is stopped and returns sstSHELL.timeoutStatus
+	# env holds extra environment variables for the command
+	def runCmdByLine(self, command, color='black', log=None, timeout=None, env=None):
+		process = sstSHELL.startProcess(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+		                                env=dict(os.environ, **env) if env else None)
+		self.processes.append(process)
+		runLog = sstSHELL.RunLog(log or sstSHELL.runLogPath(command), compress=self.compressLogs)
+		reader = OutputReader(process.stdout, self)
+		def output(lines):
+			for line in lines:
+				self.writeInfo(line, color)
+				runLog.write(line)
+		reader.output.connect(output)
+		loop = QEventLoop()
+		reader.finished.connect(loop.quit)
+		timer = QTimer(self)
+		timer.setSingleShot(True)
+		timer.timeout.connect(lambda: self.stopProcesses([process]))
+		if timeout:
+			timer.start(int(timeout * 1000))
+		reader.start()
+		self.eventLoops += 1
+		loop.exec_()
+		self.eventLoops -= 1
+		reader.wait()
+		timedOut = timeout and not timer.isActive()
+		timer.stop()
+		process.wait()
+		process.stdout.close()
+		self.processes.remove(process)
+		runLog.close()
+		if timedOut:
+			self.writeInfo('\n*** Stopped after running for ' + sstSHELL.formatDuration(timeout) + ' ***\n', 'red')
+			return sstSHELL.timeoutStatus
+		return process.returncode
+
+
+	# Runs the commands jobs at a time on a ParallelRunner, each writing its
+	# output to its log. finished is called with the index, exit status and
+	# (wall seconds, max RSS) of every command as it finishes and started, if
+	# given, with the index of every command started. The GUI keeps running
+	# meanwhile, Stop ends the commands still running. Returns False if the
+	# commands could not all be run, the error is written to the info screen
+	def runParallel(self, commands, logs, jobs, finished, started=None):
+		runner = ParallelRunner(commands, logs, jobs, self.runTimeout(), self)
+		runner.runFinished.connect(finished)
+		if started is not None:
+			runner.runStarted.connect(started)
+		errors = []
+		def failed(error):
+			errors.append(error)
+			self.writeInfo('*** COULD NOT RUN THE SWEEP ***\n' + error + '\n', 'red')
+		runner.failed.connect(failed)
+		loop = QEventLoop()
+		runner.finished.connect(loop.quit)
+		self.runners.append(runner)
+		if self.cancelled:
+			runner.stop()
+		runner.start()
+		self.eventLoops += 1
+		loop.exec_()
+		self.eventLoops -= 1
+		runner.wait()
+		self.runners.remove(runner)
+		return not errors
+
+
+	# Stops commands started by runCmdByLine without waiting for them, they
+	# are asked to terminate and killed if still running after a grace period
+	def stopProcesses(self, processes):
+		processes = sstSHELL.signalProcesses(processes, signal.SIGTERM)
+		if processes:
+			QTimer.singleShot(int(sstSHELL.killGrace * 1000), lambda: sstSHELL.signalProcesses(processes, signal.SIGKILL))
+
+
+	# Runs started with beginRun can be stopped until the matching endRun,
+	# the other run buttons wait until then
+	def beginRun(self):
+		if not self.runs:
+			self.cancelled = False
+			self.stopRun.setEnabled(True)
+			for button in self.runButtons:
+				button.setEnabled(False)
+		self.runs += 1
+
+
+	def endRun(self):
+		self.runs -= 1
+		if not self.runs:
+			self.stopRun.setEnabled(False)
+			for button in self.runButtons:
+				button.setEnabled(True)
+
+
+	# Stop button, ends the running commands and what was still to run
+	def cancelRuns(self):
+		self.cancelled = True
+		self.writeInfo('\n*** Stopping ***\n', 'red')
+		self.stopProcesses(self.processes)
+		for runner in self.runners:
+			runner.stop()
+
+
+	# Update all tabs, the element catalog is (re)loaded in the background and
+	# the component lists are filled in by catalogLoaded when it arrives
 	def updateTabs(self):
-		if self.isSSTinstalled():
-			self.sstinfo = ET.fromstring(sstSHELL.runCommand('sst-info -qnxo /dev/stdout'))
-			self.updateModels()
 		self.updateTemplates()
-		self.updateTopologies()
+		if self.isSSTinstalled():
+			self.updateCatalog()
+		self.updateOverwrite()
 		self.modelDir.setText(str(os.getcwd()))
 		if self.tabWidget.currentIndex() == 1 and self.header.text():
 			self.modelDir.setText(os.path.dirname(self.header.text()))
 
 
+	# Starts a background refresh of the element catalog, the libraries in
+	# refresh are always queried again
+	def updateCatalog(self, refresh=[]):
+		self.catalogLoader.refresh.extend(refresh)
+		if not self.catalogLoader.isRunning():
+			if not self.catalog.elements:
+				self.catalogLoading()
+			self.catalogLoader.start()
+
+
+	# Show a loading state in the lists that are filled from the element catalog
+	def catalogLoading(self):
+		self.availableModel.setMessage('Loading SST element catalog...')
+		self.available.setEnabled(False)
+		self.listTopologies.setEnabled(False)
+		self.listEndpoints.setEnabled(False)
+
+
+	# The element catalog has been loaded by the CatalogLoader
+	def catalogLoaded(self, catalog):
+		self.catalogError = False
+		self.catalog = catalog
+		self.available.setEnabled(True)
+		self.listTopologies.setEnabled(True)
+		self.listEndpoints.setEnabled(True)
+		self.updateModels()
+		self.updateTopologies()
+
+
+	# The CatalogLoader could not load the catalog, the lists keep the catalog
+	# they had. The load is tried again on the next tab change
+	def catalogFailed(self, error):
+		self.catalogError = True
+		self.elements = list(self.catalog.elements)
+		self.writeInfo('*** COULD NOT LOAD THE SST ELEMENT CATALOG ***\n' + error + '\n\n', 'red')
+		self.availableModel.setCatalog(self.catalog)
+		self.searchComponents()
+		self.available.setEnabled(True)
+		self.listTopologies.setEnabled(True)
+		self.listEndpoints.setEnabled(True)
+
+
+	# Run the loader again if libraries were queued while it was busy, unless
+	# it just failed
+	def catalogFinished(self):
+		if self.catalogLoader.refresh and not self.catalogError:
+			self.catalogLoader.start()
+
+
+	# Let a running catalog load finish before the window goes away
+	def closeEvent(self, event):
+		if self.runs:
+			self.cancelRuns()
+		for runner in self.runners:
+			runner.wait()
+		self.catalogLoader.wait()
+		event.accept()
+
+
 	# File Creation message
 	def createdFilesMessage(self, files):
 		self.writeSeparator()
@@ -794,35 +1689,26 @@ class MyApp(QMainWindow, Ui_MainWindow):
 								incomment = True
 
 
-	# Display model information from sst-info
-	def sstInfoHelp(self, items, displayAll = False):
-		for item in items:
+	# Display model information from the element catalog
+	def sstInfoHelp(self, paths, displayAll = False):
+		for path in paths:
 			self.writeSeparator()
-			# Get sst-info description
-			if item.parent():
-				text = sstSHELL.runCommand('sst-info ' + item.parent().text(0) + '.' + item.text(0))
+			if len(path) == 1:
+				# If item is an element, print out the whole element with components and subcomponents
+				text = self.catalog.help(path[0], None, displayAll)
+			elif len(path) == 2:
+				text = self.catalog.help(path[0], path[1], displayAll)
 			else:
-				text = sstSHELL.runCommand('sst-info ' + item.text(0))
-			# If we want to display all of the sst-info output, write it
-			if displayAll:
-				self.writeInfo(text, 'gray')
-			else:
-				# otherwise just print out the component/subcomponent selected
-				for line in text.split('\n'):
-					l = line.strip()
-					if item.parent():
-						if l.startswith('COMPONENT') or l.startswith('SUBCOMPONENT'):
-							self.writeInfo(l + '\n', 'gray')
-					else:
-						# If item is an element, print out the whole element with components and subcomponents
-						if l.startswith('ELEMENT') or l.startswith('COMPONENT') or l.startswith('SUBCOMPONENT'):
-							self.writeInfo(l + '\n', 'gray')
+				# Subcomponents may come from a different element than their component
+				sub = self.catalog.find(path[2], path[0], 'SubComponent')
+				text = self.catalog.help(sub['Element'], sub['Name'], displayAll)
+			self.writeInfo(text, 'gray')
 	# Available Models Help
 	def availableHelp(self):
-		self.sstInfoHelp(self.available.selectedItems())
+		self.sstInfoHelp(self.selectedPaths(self.available))
 	# Selected Models Help
 	def selectedHelp(self):
-		self.sstInfoHelp(self.selected.selectedItems(), True)
+		self.sstInfoHelp(self.selectedPaths(self.selected), True)
 
 
 	# Display help from network gen double clicks
@@ -831,13 +1717,20 @@ class MyApp(QMainWindow, Ui_MainWindow):
 		self.writeInfo(text + '\n', 'gray')
 	# Topologies Help
 	def topoHelp(self):
-		self.networkGenHelp(sstSHELL.runCommand('sst-info merlin.' + self.listTopologies.currentItem().text()))
+		topo = self.selectedTopology()
+		self.networkGenHelp(self.catalog.help(topo['Element'], topo['Name'], True))
 	# Endpoints Help
 	def endpointHelp(self):
-		self.networkGenHelp(sstSHELL.runCommand('sst-info merlin.' + self.listEndpoints.currentItem().text()))
+		self.networkGenHelp(self.catalog.help('merlin', self.listEndpoints.currentItem().text() + '_endpoint', True))
 	# Parameters Help (hr_router)
 	def hrrouterHelp(self):
-		self.networkGenHelp(sstSHELL.runCommand('sst-info merlin.hr_router'))
+		self.networkGenHelp(self.catalog.help('merlin', 'hr_router', True))
+
+
+	# Catalog entry of the selected topology, in the element it came from
+	def selectedTopology(self):
+		item = self.listTopologies.currentItem()
+		return self.catalog.find(item.text(), item.data(Qt.UserRole), 'SubComponent')
 
 
 	# Populates the parameters of a topology into the Network Gen tab Parameter list
@@ -848,15 +1741,14 @@ class MyApp(QMainWindow, Ui_MainWindow):
 		self.listParameters.item(self.listParameters.count()-1).setFont(self.bold)
 		self.listValues.addItem('Topology Values:')
 		self.listValues.item(self.listValues.count()-1).setFont(self.bold)
-		topo = self.sstinfo.find('Element[@Name="merlin"]/SubComponent[@Name="' + self.listTopologies.currentItem().text() + '"]')
-		for param in topo.findall('Parameter'):
+		topo = self.selectedTopology()
+		for param in self.catalog.params(topo):
 			# Parameter name is stored as <topology:parameter name>
-			if 'DEPRECATED' not in param.get('Description'):
-				if 'Not Required for pymerlin use' not in param.get('Default'):
-					if param.get('Name') not in self.badParams:
-						self.listParameters.addItem(param.get('Name'))
-						# Populate the default values of the topology parameters
-						self.listValues.addItem(param.get('Default'))
+			if 'Not Required for pymerlin use' not in param.get('Default'):
+				if param.get('Name') not in self.badParams:
+					self.listParameters.addItem(param.get('Name'))
+					# Populate the default values of the topology parameters
+					self.listValues.addItem(param.get('Default'))
 
 
 	# Adds a bold header to the Parameter and Value lists
@@ -869,17 +1761,17 @@ class MyApp(QMainWindow, Ui_MainWindow):
 
 	# Populates the Component paramters into the Parameter list
 	def popComponentParams(self, item):
-		comp = self.sstinfo.find('Element[@Name="merlin"]/Component[@Name="' + item + '"]')
-		for param in comp.findall('Parameter'):
+		comp = self.catalog.find(item, 'merlin', 'Component')
+		for param in self.catalog.params(comp):
 			# Parameter name is stored as <topology:parameter name>
-			if 'DEPRECATED' not in param.get('Description'):
-				if param.get('Name') not in self.badParams:
-					self.listParameters.addItem(param.get('Name'))
-					# Populate the default values of the parameters
-					if param.get('Name') == 'topology':
-						self.listValues.addItem('merlin.' + self.listTopologies.currentItem().text())
-					else:
-						self.listValues.addItem(param.get('Default'))
+			if param.get('Name') not in self.badParams:
+				self.listParameters.addItem(param.get('Name'))
+				# Populate the default values of the parameters
+				if param.get('Name') == 'topology':
+					topo = self.selectedTopology()
+					self.listValues.addItem(topo['Element'] + '.' + topo['Name'])
+				else:
+					self.listValues.addItem(param.get('Default'))
 
 
 	### End Application Helper Functions
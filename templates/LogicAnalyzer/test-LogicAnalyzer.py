@@ -4,7 +4,7 @@ obj0 = sst.Component("<model>0", "<model>.<model>")
 obj0.addParams({
 	"TriggerStartL" : "TriggerStart",
 	"TriggerStopL" : "TriggerStop",
-	"TriggerL" : "false"
+	"TriggerL" : "false",
 	"TriggerStartR" : "TriggerStart",
 	"TriggerStopR" : "TriggerStop",
 	"TriggerR" : "false"
@@ -12,9 +12,9 @@ obj0.addParams({
 
 obj1 = sst.Component("<model>1", "<model>.<model>")
 obj1.addParams({
-	"TriggerStarLt" : "TriggerStart",
+	"TriggerStartL" : "TriggerStart",
 	"TriggerStopL" : "TriggerStop",
-	"TriggerL" : "false"
+	"TriggerL" : "false",
 	"TriggerStartR" : "TriggerStart",
 	"TriggerStopR" : "TriggerStop",
 	"TriggerR" : "false"